@@ -0,0 +1,133 @@
+from functools import lru_cache
+
+import numpy
+
+
+class Analytic:
+    """
+    Analytical results for the M/M/C/C and M1/M2/M/C/C systems, vectorised over arrays of rates
+    """
+
+    @lru_cache(maxsize=64)
+    def log_factorials(n: int) -> numpy.ndarray:
+        """
+        Table of log(k!) for k from 0 to n, memoised per n
+        :param n: Largest k
+        :return: Read-only array of length n+1
+        """
+        table = numpy.zeros(n + 1)
+        numpy.cumsum(numpy.log(numpy.arange(1, n + 1)), out=table[1:])
+        table.flags.writeable = False
+        return table
+
+    def xlogy(x, y):
+        """
+        x * log(y), taken as 0 where x is 0 so that empty powers of a zero rate vanish
+        :param x: Exponents
+        :param y: Bases
+        :return: Array of x * log(y)
+        """
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return numpy.where(x == 0, 0.0, x * numpy.log(y))
+
+    def erlang_b(server_number: int, arrival_rate, departure_rate):
+        """
+        Erlang-B blocking probability by the stable recursion B(k) = aB(k-1) / (k + aB(k-1))
+        :param server_number: Number of servers
+        :param arrival_rate: Rate of arrival of events, scalar or array
+        :param departure_rate: Rate of departure of events, scalar or array
+        :return: Blocking probability, shaped as the broadcast rates
+        """
+        load = numpy.asarray(arrival_rate, dtype=float) / numpy.asarray(departure_rate, dtype=float)
+        blocking = numpy.ones_like(load)
+        for k in range(1, server_number + 1):
+            blocking = load * blocking / (k + load * blocking)
+        return blocking
+
+    def server_utilisation(server_number: int, arrival_rate, departure_rate):
+        """
+        Expected number of busy servers, the carried load a(1 - B)
+        :param server_number: Number of servers
+        :param arrival_rate: Rate of arrival of events, scalar or array
+        :param departure_rate: Rate of departure of events, scalar or array
+        :return: Expected busy servers, shaped as the broadcast rates
+        """
+        load = numpy.asarray(arrival_rate, dtype=float) / numpy.asarray(departure_rate, dtype=float)
+        return load * (1 - Analytic.erlang_b(server_number, arrival_rate, departure_rate))
+
+    def occupancy(server_number: int, threshold: int, handover_rate, newcall_rate, departure_rate):
+        """
+        Stationary distribution of busy servers under handover reservation, computed in log space.
+        Up to C - threshold busy servers P(k) is proportional to A^k/k! with A the combined load,
+        above that to A^(C-T) * H^(k-C+T)/k! with H the handover load
+        :param server_number: Number of servers
+        :param threshold: Servers reserved for handovers
+        :param handover_rate: Arrival rate of handover events, scalar or array
+        :param newcall_rate: Arrival rate of newcall events, scalar or array
+        :param departure_rate: Departure rate of events, scalar or array
+        :return: Array of P(k), shaped as the broadcast rates plus a last axis of length C+1
+        """
+        handover_rate, newcall_rate, departure_rate = numpy.broadcast_arrays(
+            *(numpy.asarray(rate, dtype=float) for rate in (handover_rate, newcall_rate, departure_rate)))
+        combined = ((handover_rate + newcall_rate) / departure_rate)[..., None]
+        handover = (handover_rate / departure_rate)[..., None]
+
+        common = server_number - threshold
+        log_factorials = Analytic.log_factorials(server_number)
+        k = numpy.arange(server_number + 1)
+        reserved = numpy.maximum(k - common, 0)
+
+        # Each side of the threshold is filled in place, so no branch is built over the whole array
+        weights = numpy.empty(combined.shape[:-1] + (server_number + 1,))
+        weights[..., :common + 1] = Analytic.xlogy(k[:common + 1], combined) - log_factorials[:common + 1]
+        weights[..., common + 1:] = Analytic.xlogy(common, combined) + \
+            Analytic.xlogy(reserved[common + 1:], handover) - log_factorials[common + 1:]
+        weights -= weights.max(axis=-1, keepdims=True)
+        numpy.exp(weights, out=weights)
+        weights /= weights.sum(axis=-1, keepdims=True)
+        return weights
+
+    def threshold_losses(server_number: int, threshold: int, handover_rate, newcall_rate, departure_rate) -> tuple:
+        """
+        Handover failure and new call blocking probabilities, vectorised over rates in memory of the size of
+        the rates. The probability b(k) of k busy servers in the chain cut off at k follows the Erlang-B
+        recursion b(k) = a b(k-1) / (k + a b(k-1)), with a the combined load up to C - threshold and the
+        handover load above, so b(C) is the HFP. Each 1 - b(k) is the chance of fewer than k busy given at
+        most k, so the CBP is one minus their product from C - threshold up, summed in log space to keep it
+        accurate when small
+        :param server_number: Number of servers
+        :param threshold: Servers reserved for handovers
+        :param handover_rate: Arrival rate of handover events, scalar or array
+        :param newcall_rate: Arrival rate of newcall events, scalar or array
+        :param departure_rate: Departure rate of events, scalar or array
+        :return: Tuple of arrays, handovers are lost with all servers busy and new calls with C - threshold busy
+        """
+        handover_rate, newcall_rate, departure_rate = numpy.broadcast_arrays(
+            *(numpy.asarray(rate, dtype=float) for rate in (handover_rate, newcall_rate, departure_rate)))
+        combined = (handover_rate + newcall_rate) / departure_rate
+        handover = handover_rate / departure_rate
+
+        common = server_number - threshold
+        blocking = numpy.ones_like(combined)
+        with numpy.errstate(divide="ignore"):
+            # With no shared servers every new call is blocked, b(0) being 1
+            admitted = numpy.log1p(-blocking) if common == 0 else numpy.zeros_like(combined)
+            for k in range(1, server_number + 1):
+                load = combined if k <= common else handover
+                blocking = load * blocking / (k + load * blocking)
+                if k >= common:
+                    admitted += numpy.log1p(-blocking)
+        return blocking, -numpy.expm1(admitted)
+
+    def aggregated_blocking(server_number: int, threshold: int, handover_rate, newcall_rate, departure_rate):
+        """
+        Expected aggregated blocking probability, new call blocking plus 10 times handover failure
+        :param server_number: Number of servers
+        :param threshold: Servers reserved for handovers
+        :param handover_rate: Arrival rate of handover events, scalar or array
+        :param newcall_rate: Arrival rate of newcall events, scalar or array
+        :param departure_rate: Departure rate of events, scalar or array
+        :return: Expected aggregated blocking probability, shaped as the broadcast rates
+        """
+        HFP, CBP = Analytic.threshold_losses(server_number, threshold, handover_rate, newcall_rate, departure_rate)
+        return CBP + 10 * HFP
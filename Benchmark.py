@@ -0,0 +1,207 @@
+from argparse import ArgumentParser
+from json import dump, load
+from platform import python_version
+from time import perf_counter
+import sys
+import tracemalloc
+
+from Event import Event
+from EventHandler import EventHandler
+from M1M2MCC import M1M2MCC
+from MMCC import MMCC
+from Servers import Servers
+from Variates import Variates
+
+
+class Benchmark:
+    """
+    Reproducible benchmarks of the simulation components and of full runs
+    """
+
+    # Scaling matrix of full runs
+    SERVERS = [16, 64, 256, 1024, 4096]
+    ARRIVALS = [10**3, 10**4, 10**5, 10**6, 10**7]
+    # Offered load per server of full runs
+    LOAD = 0.9
+    DEPARTURE_RATE = 0.01
+
+    def __init__(self, seed: int = 0, repeats: int = 3):
+        """
+        Initialisation
+        :param seed: Seed of every benchmark
+        :param repeats: Timed repetitions of each case, the fastest is kept
+        """
+        self.seed = seed
+        self.repeats = repeats
+        self.results = []
+
+    def measure(self, name: str, parameters: dict, case, events: int):
+        """
+        Time a case and measure its peak traced memory in a separate pass
+        :param name: Benchmark name
+        :param parameters: Parameters describing the case
+        :param case: Callable running the case once
+        :param events: Events handled by one call of case
+        """
+        seconds = float("inf")
+        for _ in range(self.repeats):
+            start = perf_counter()
+            case()
+            seconds = min(seconds, perf_counter() - start)
+
+        tracemalloc.start()
+        case()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        result = {"name": name, "parameters": parameters, "seconds": seconds, "events": events,
+                  "events_per_second": events / seconds, "peak_memory": peak}
+        self.results.append(result)
+        print(name, parameters, "%.0f events/s" % result["events_per_second"],
+              "%.1f KiB peak" % (peak / 1024), file=sys.stderr)
+
+    def event_handler(self, pending: int, operations: int):
+        """
+        Benchmark EventHandler.add and EventHandler.next at a steady number of pending events
+        :param pending: Pending events held in the calendar
+        :param operations: Pairs of add and next
+        """
+        variates = Variates(self.seed)
+        events = [Event(Event.ARRIVAL, 0, 1.0, variates) for _ in range(pending)]
+
+        def case():
+            handler = EventHandler()
+            for event in events:
+                handler.add(event)
+            for _ in range(operations):
+                event = handler.next()
+                event.begin(event.key + 1.0)
+                handler.add(event)
+
+        self.measure("event_handler", {"pending": pending, "operations": operations}, case, 2 * operations)
+
+    def servers(self, server_number: int, operations: int):
+        """
+        Benchmark Servers.allocate and Servers.deallocate with half of the servers busy
+        :param server_number: Number of servers
+        :param operations: Pairs of allocate and deallocate
+        """
+        def case():
+            servers = Servers(server_number)
+            busy = [servers.allocate() for _ in range(server_number // 2)]
+            for i in range(operations):
+                servers.deallocate(busy[i % len(busy)])
+                busy[i % len(busy)] = servers.allocate()
+
+        self.measure("servers", {"server_number": server_number, "operations": operations}, case, 2 * operations)
+
+    def event_construction(self, count: int):
+        """
+        Benchmark Event construction, each drawing an inter-arrival time
+        :param count: Events constructed
+        """
+        def case():
+            variates = Variates(self.seed)
+            for _ in range(count):
+                Event(Event.ARRIVAL, 0, 0.1, variates)
+
+        self.measure("event_construction", {"count": count}, case, count)
+
+    def run(self, model: type, server_number: int, arrival_total: int):
+        """
+        Benchmark a full run at LOAD erlangs per server
+        :param model: MMCC or M1M2MCC
+        :param server_number: Number of servers
+        :param arrival_total: Number of events
+        """
+        rate = Benchmark.LOAD * server_number * Benchmark.DEPARTURE_RATE
+        machine = model()
+        if model is M1M2MCC:
+            parameters = {"total_servers": server_number, "arrival_total": arrival_total,
+                          "threshold": max(1, server_number // 8), "handover_rate": rate / 2,
+                          "newcall_rate": rate / 2}
+        else:
+            parameters = {"server_number": server_number, "arrival_total": arrival_total, "arrival_rate": rate}
+
+        def case():
+            machine.run(departure_rate=Benchmark.DEPARTURE_RATE, seed=self.seed, **parameters)
+
+        case()
+        self.measure(model.__name__, {"server_number": server_number, "arrival_total": arrival_total},
+                     case, machine.summary()["events"])
+
+    def suite(self, servers: list, arrivals: list, operations: int = 10**5):
+        """
+        Run the component benchmarks and the scaling matrix of full runs
+        :param servers: Server counts of the matrix
+        :param arrivals: Arrival totals of the matrix
+        :param operations: Operations of each component benchmark
+        """
+        for server_number in servers:
+            self.event_handler(server_number, operations)
+            self.servers(server_number, operations)
+        self.event_construction(operations)
+
+        for model in (MMCC, M1M2MCC):
+            for server_number in servers:
+                for arrival_total in arrivals:
+                    self.run(model, server_number, arrival_total)
+
+    def save(self, path: str):
+        """
+        Write results as JSON
+        :param path: Output file
+        """
+        with open(path, "w") as f:
+            dump({"python": python_version(), "seed": self.seed, "results": self.results}, f, indent=2)
+
+    def compare(self, path: str, tolerance: float) -> list:
+        """
+        Compare results with a saved baseline
+        :param path: Baseline file written by save
+        :param tolerance: Relative loss of events/s or gain of peak memory tolerated
+        :return: List of regression descriptions
+        """
+        with open(path) as f:
+            baseline = {(r["name"], tuple(sorted(r["parameters"].items()))): r for r in load(f)["results"]}
+
+        regressions = []
+        for result in self.results:
+            previous = baseline.get((result["name"], tuple(sorted(result["parameters"].items()))))
+            if previous is None:
+                continue
+            speed = result["events_per_second"] / previous["events_per_second"]
+            memory = result["peak_memory"] / max(previous["peak_memory"], 1)
+            if speed < 1 - tolerance:
+                regressions.append("%s %s: %.1f%% slower" % (result["name"], result["parameters"], 100 * (1 - speed)))
+            if memory > 1 + tolerance:
+                regressions.append("%s %s: %.1f%% more memory" % (result["name"], result["parameters"],
+                                                                 100 * (memory - 1)))
+        return regressions
+
+
+if __name__ == "__main__":
+
+    parser = ArgumentParser(description="Benchmark the simulation components and full runs")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file to write results to")
+    parser.add_argument("--compare", help="Baseline JSON file to flag regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative regression tolerated")
+    parser.add_argument("--servers", type=int, nargs="+", default=Benchmark.SERVERS[:3])
+    parser.add_argument("--arrivals", type=int, nargs="+", default=Benchmark.ARRIVALS[:3])
+    parser.add_argument("--full", action="store_true", help="Run the whole scaling matrix")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    benchmark = Benchmark(arguments.seed, arguments.repeats)
+    if arguments.full:
+        benchmark.suite(Benchmark.SERVERS, Benchmark.ARRIVALS)
+    else:
+        benchmark.suite(arguments.servers, arguments.arrivals)
+    benchmark.save(arguments.output)
+
+    if arguments.compare:
+        regressions = benchmark.compare(arguments.compare, arguments.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,191 @@
+from numpy.random import SeedSequence
+
+from Analytic import Analytic
+from Event import Event
+from EventVariant import EventVariant
+from MarkovMMCC import MarkovMMCC
+from Statistics import Statistics
+from Sweep import Sweep
+
+
+class CapacitySearch:
+    """
+    Finds operating points at a blocking target, starting from the analytic model and refining by simulation
+    """
+
+    def __init__(self, model: type = MarkovMMCC, target: float = 0.01, arrival_total: int = 10000,
+                 replications: int = 4, max_replications: int = 16, confidence: float = 0.95,
+                 tolerance: float = 0.01, seed=None, workers: int = 1):
+        """
+        Initialisation
+        :param model: Simulation class, one of the MMCC or M1M2MCC engines
+        :param target: Blocking probability target, the ABP for threshold models
+        :param arrival_total: Number of events of each replication
+        :param replications: Replications of a first evaluation
+        :param max_replications: Replications after which an evaluation that straddles the target is accepted
+        :param confidence: Confidence level of the intervals
+        :param tolerance: Relative width of the rate bracket at which bisection stops
+        :param seed: Integer seed or SeedSequence of the search
+        :param workers: Number of processes of each round of replications, all cores if None. A round is a few
+        short runs, for which starting a pool costs more than it saves unless runs are long
+        """
+        self.model = model
+        self.target = target
+        self.arrival_total = arrival_total
+        self.replications = replications
+        self.max_replications = max_replications
+        self.confidence = confidence
+        self.tolerance = tolerance
+        self.seeds = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self.sweep = Sweep(model, workers)
+        self.arrivals = 0
+
+    def analytic(self, parameters: dict) -> float:
+        """
+        Expected blocking of a configuration
+        :param parameters: Parameters of run
+        :return: Erlang-B blocking, or ABP when a threshold is given
+        """
+        if "threshold" in parameters:
+            return float(Analytic.aggregated_blocking(
+                parameters["total_servers"], parameters["threshold"],
+                parameters.get("handover_rate", EventVariant.PRIORITIES["handover"]),
+                parameters.get("newcall_rate", EventVariant.PRIORITIES["newcall"]),
+                parameters.get("departure_rate", EventVariant.DEPARTURE_RATE)))
+        return float(Analytic.erlang_b(parameters["server_number"],
+                                       parameters.get("arrival_rate", Event.ARRIVAL_RATE),
+                                       parameters.get("departure_rate", Event.DEPARTURE_RATE)))
+
+    def analytic_rate(self, rate_name: str, parameters: dict, upper: float = 1.0) -> float:
+        """
+        Rate at which the analytic blocking meets the target, by bisection
+        :param rate_name: Name of the rate parameter of run to solve for
+        :param parameters: Remaining parameters of run
+        :param upper: Initial upper bound, doubled until the target is exceeded
+        :return: Analytic rate at target
+        """
+        while self.analytic(dict(parameters, **{rate_name: upper})) < self.target:
+            upper *= 2
+        lower = 0.0
+        for _ in range(60):
+            middle = (lower + upper) / 2
+            if self.analytic(dict(parameters, **{rate_name: middle})) < self.target:
+                lower = middle
+            else:
+                upper = middle
+        return (lower + upper) / 2
+
+    def compare(self, parameters: dict) -> tuple:
+        """
+        Compare simulated blocking of a configuration with the target, doubling the replications until
+        the confidence interval excludes the target or max_replications is reached. Earlier replications
+        are kept, each round only runs the new ones on fresh streams of the configuration
+        :param parameters: Parameters of run
+        :return: Tuple of -1 below target, 1 above or 0 undecided, and the replication record
+        """
+        sequence = self.seeds.spawn(1)[0]
+        statistics = Statistics()
+        replications = self.replications
+        while True:
+            # Each replication is a grid point with its own seed, so the blocking of each is returned
+            seeds = sequence.spawn(replications - statistics.count)
+            results = self.sweep.run({"seed": seeds}, arrival_total=self.arrival_total, **parameters)
+            for blocking in results["blocking_probability"]:
+                statistics.add(float(blocking))
+            self.arrivals += len(seeds) * self.arrival_total
+
+            mean, half_width = statistics.mean, statistics.half_width(self.confidence)
+            record = {"blocking_probability": mean, "blocking_probability_ci": half_width,
+                      "replications": statistics.count}
+            if mean + half_width < self.target:
+                return -1, record
+            if mean - half_width > self.target:
+                return 1, record
+            if replications >= self.max_replications:
+                return 0, record
+            replications *= 2
+
+    def max_rate(self, rate_name: str, **parameters) -> dict:
+        """
+        Largest rate whose simulated blocking is under the target, bracketed around the analytic answer
+        :param rate_name: Name of the rate parameter of run to solve for
+        :param parameters: Remaining parameters of run
+        :return: Dictionary of rate, blocking estimate with half width and simulated arrivals used
+        """
+        arrivals = self.arrivals
+        guess = self.analytic_rate(rate_name, parameters)
+
+        # Widen the bracket around the analytic rate until simulation confirms it, keeping the record of
+        # the lower end as the rate reported is always that one
+        lower, upper = guess / 1.25, guess * 1.25
+        side, record = self.compare(dict(parameters, **{rate_name: lower}))
+        while side > 0:
+            lower /= 1.25
+            side, record = self.compare(dict(parameters, **{rate_name: lower}))
+        while self.compare(dict(parameters, **{rate_name: upper}))[0] < 0:
+            upper *= 1.25
+
+        while (upper - lower) / upper > self.tolerance:
+            middle = (lower + upper) / 2
+            side, middle_record = self.compare(dict(parameters, **{rate_name: middle}))
+            if side < 0:
+                lower, record = middle, middle_record
+            elif side > 0:
+                upper = middle
+            else:
+                # Target lies within the confidence interval, no finer answer is resolvable
+                lower = upper = middle
+                record = middle_record
+
+        return {"rate": lower,
+                "analytic_rate": guess,
+                "blocking_probability": float(record["blocking_probability"]),
+                "blocking_probability_ci": float(record["blocking_probability_ci"]),
+                "arrivals": self.arrivals - arrivals}
+
+    def min_servers(self, server_name: str = "server_number", **parameters) -> dict:
+        """
+        Fewest servers whose simulated blocking is under the target
+        :param server_name: Name of the server count parameter of run
+        :param parameters: Remaining parameters of run, including rates
+        :return: Dictionary of server count, blocking estimate with half width and simulated arrivals used
+        """
+        arrivals = self.arrivals
+        servers = max(parameters.get("threshold", 0) + 1, 1)
+        while self.analytic(dict(parameters, **{server_name: servers})) >= self.target:
+            servers += 1
+
+        # Step from the analytic answer until simulation agrees
+        side, record = self.compare(dict(parameters, **{server_name: servers}))
+        while side > 0:
+            servers += 1
+            side, record = self.compare(dict(parameters, **{server_name: servers}))
+        while servers > parameters.get("threshold", 0) + 1:
+            lower_side, lower_record = self.compare(dict(parameters, **{server_name: servers - 1}))
+            if lower_side > 0:
+                break
+            servers, record = servers - 1, lower_record
+
+        return {"servers": servers,
+                "blocking_probability": float(record["blocking_probability"]),
+                "blocking_probability_ci": float(record["blocking_probability_ci"]),
+                "arrivals": self.arrivals - arrivals}
+
+    def best_threshold(self, rate_name: str = "newcall_rate", spread: int = 1, **parameters) -> dict:
+        """
+        Threshold admitting the largest rate at the target, for M1M2MCC engines. Thresholds are ranked
+        analytically and only those within spread of the analytic optimum are simulated
+        :param rate_name: Name of the rate parameter of run to maximise
+        :param spread: Thresholds either side of the analytic optimum that are simulated
+        :param parameters: Remaining parameters of run, including total_servers
+        :return: max_rate result of the best threshold, with the threshold added
+        """
+        thresholds = range(parameters["total_servers"])
+        optimum = max(thresholds, key=lambda t: self.analytic_rate(rate_name, dict(parameters, threshold=t)))
+        best = None
+        for threshold in thresholds[max(optimum - spread, 0):optimum + spread + 1]:
+            result = self.max_rate(rate_name, threshold=threshold, **parameters)
+            result["threshold"] = threshold
+            if best is None or result["rate"] > best["rate"]:
+                best = result
+        return best
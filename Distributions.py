@@ -0,0 +1,361 @@
+from math import exp, log, sqrt
+from statistics import NormalDist
+
+import numpy
+
+
+class Distribution:
+    """
+    Distribution of inter-arrival or holding times, sampled in blocks from uniform variates so that
+    antithetic and common random number streams apply to it as to exponential ones
+    """
+
+    # Uniform variates consumed per draw
+    UNIFORMS = 1
+
+    def mean(self) -> float:
+        """
+        :return: Mean of the distribution
+        """
+        raise NotImplementedError
+
+    def rate(self) -> float:
+        """
+        :return: Reciprocal of the mean, the rate the analytic models see, Erlang-B depending on the
+        holding time distribution only through it
+        """
+        return 1 / self.mean()
+
+    def rate_of(value) -> float:
+        """
+        :param value: Rate of an exponential distribution, or Distribution
+        :return: Rate, the reciprocal of the mean of a distribution
+        """
+        return value.rate() if isinstance(value, Distribution) else value
+
+    def sample(self, uniforms: numpy.ndarray) -> numpy.ndarray:
+        """
+        Transform uniform variates into draws
+        :param uniforms: Array of uniforms on [0, 1), one row per draw and UNIFORMS columns
+        :return: Array of draws
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        """
+        :return: Description that identifies the distribution, used in result cache keys
+        """
+        parameters = ", ".join(name + "=" + repr(value) for name, value in sorted(self.parameters().items()))
+        return type(self).__name__ + "(" + parameters + ")"
+
+    def parameters(self) -> dict:
+        """
+        :return: Parameters the distribution was built from
+        """
+        raise NotImplementedError
+
+    def alias(weights) -> tuple:
+        """
+        Alias table of a discrete distribution by Vose's method, so a category is drawn in constant time
+        :param weights: Non-negative weight of each category
+        :return: Arrays of the probability of keeping each column and the category it otherwise aliases
+        """
+        weights = numpy.asarray(weights, dtype=float)
+        scaled = weights * len(weights) / weights.sum()
+        keep = numpy.ones(len(weights))
+        alias = numpy.arange(len(weights))
+        small = [i for i, w in enumerate(scaled) if w < 1]
+        large = [i for i, w in enumerate(scaled) if w >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            keep[s], alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        return keep, alias
+
+    def category(uniforms: numpy.ndarray, keep: numpy.ndarray, alias: numpy.ndarray) -> numpy.ndarray:
+        """
+        Draw categories from an alias table, the column from the integer part and the coin from the
+        fractional part of a scaled uniform
+        :param uniforms: Uniform variates
+        :param keep: Probabilities of keeping each column
+        :param alias: Category each column otherwise aliases
+        :return: Array of categories
+        """
+        scaled = uniforms * len(keep)
+        column = scaled.astype(int)
+        return numpy.where(scaled - column < keep[column], column, alias[column])
+
+
+class Exponential(Distribution):
+    """
+    Exponential distribution, drawn by inversion
+    """
+
+    def __init__(self, rate: float):
+        """
+        Initialisation
+        :param rate: Rate of distribution
+        """
+        self.exponential_rate = rate
+
+    def mean(self) -> float:
+        """
+        :return: Reciprocal of the rate
+        """
+        return 1 / self.exponential_rate
+
+    def sample(self, uniforms: numpy.ndarray) -> numpy.ndarray:
+        """
+        Invert the CDF of each uniform
+        :param uniforms: Array of uniforms, one column
+        :return: Array of draws
+        """
+        return -numpy.log1p(-uniforms[:, 0]) / self.exponential_rate
+
+    def parameters(self) -> dict:
+        """
+        :return: Rate of the distribution
+        """
+        return {"rate": self.exponential_rate}
+
+
+class Tabulated(Distribution):
+    """
+    Distribution drawn by interpolating a table of its inverse CDF at equally spaced probabilities,
+    with draws in the two outer cells inverted exactly so the tails are kept
+    """
+
+    # Intervals of the inverse CDF table
+    TABLE_SIZE = 4096
+
+    def tabulate(self):
+        """
+        Build the inverse CDF table, called by subclasses once their parameters are set
+        """
+        probabilities = numpy.linspace(0, 1, Tabulated.TABLE_SIZE + 1)
+        self.table = numpy.empty(Tabulated.TABLE_SIZE + 1)
+        self.table[1:-1] = self.quantile(probabilities[1:-1])
+        self.table[0], self.table[-1] = self.table[1], self.table[-2]
+
+    def quantile(self, probabilities: numpy.ndarray) -> numpy.ndarray:
+        """
+        Exact inverse CDF
+        :param probabilities: Probabilities strictly between 0 and 1
+        :return: Quantiles
+        """
+        raise NotImplementedError
+
+    def sample(self, uniforms: numpy.ndarray) -> numpy.ndarray:
+        """
+        Interpolate the inverse CDF table between the two entries around each uniform
+        :param uniforms: Array of uniforms, one column
+        :return: Array of draws
+        """
+        uniforms = uniforms[:, 0]
+        scaled = uniforms * Tabulated.TABLE_SIZE
+        cell = scaled.astype(int)
+        fraction = scaled - cell
+        draws = self.table[cell] * (1 - fraction) + self.table[cell + 1] * fraction
+        tails = (cell == 0) | (cell == Tabulated.TABLE_SIZE - 1)
+        if tails.any():
+            # Uniforms of exactly 0 are nudged into the open interval the quantile is defined on
+            draws[tails] = self.quantile(numpy.clip(uniforms[tails], 2**-53, None))
+        return draws
+
+
+class LogNormal(Tabulated):
+    """
+    Lognormal distribution, given by its mean and standard deviation
+    """
+
+    def __init__(self, mean: float, deviation: float):
+        """
+        Initialisation
+        :param mean: Mean of distribution
+        :param deviation: Standard deviation of distribution
+        """
+        self.lognormal_mean = mean
+        self.deviation = deviation
+        self.sigma = sqrt(log(1 + (deviation / mean)**2))
+        self.mu = log(mean) - self.sigma**2 / 2
+        self.tabulate()
+
+    def mean(self) -> float:
+        """
+        :return: Mean the distribution was given
+        """
+        return self.lognormal_mean
+
+    def quantile(self, probabilities: numpy.ndarray) -> numpy.ndarray:
+        """
+        Exponential of the normal quantile with the log mean and deviation
+        :param probabilities: Probabilities strictly between 0 and 1
+        :return: Quantiles
+        """
+        normal = NormalDist(self.mu, self.sigma)
+        return numpy.array([exp(normal.inv_cdf(p)) for p in probabilities])
+
+    def parameters(self) -> dict:
+        """
+        :return: Mean and standard deviation of the distribution
+        """
+        return {"mean": self.lognormal_mean, "deviation": self.deviation}
+
+
+class Erlang(Tabulated):
+    """
+    Erlang distribution, the sum of k exponential phases
+    """
+
+    def __init__(self, k: int, rate: float):
+        """
+        Initialisation
+        :param k: Number of phases
+        :param rate: Rate of each phase
+        """
+        self.k = k
+        self.phase_rate = rate
+        self.tabulate()
+
+    def mean(self) -> float:
+        """
+        :return: Phases over the phase rate
+        """
+        return self.k / self.phase_rate
+
+    def cdf(self, times: numpy.ndarray) -> numpy.ndarray:
+        """
+        :param times: Times
+        :return: Probability of a draw no greater than each time
+        """
+        x = self.phase_rate * times
+        term = numpy.ones_like(x)
+        total = numpy.ones_like(x)
+        for n in range(1, self.k):
+            term = term * x / n
+            total += term
+        return 1 - numpy.exp(-x) * total
+
+    def quantile(self, probabilities: numpy.ndarray) -> numpy.ndarray:
+        """
+        Bisection on the closed form CDF, vectorised over the probabilities
+        :param probabilities: Probabilities strictly between 0 and 1
+        :return: Quantiles
+        """
+        # The upper bound lies beyond the largest quantile of a 53-bit uniform
+        low = numpy.zeros(len(probabilities))
+        high = numpy.full(len(probabilities), (self.k + 40 * sqrt(self.k) + 40) / self.phase_rate)
+        for _ in range(100):
+            middle = (low + high) / 2
+            below = self.cdf(middle) < probabilities
+            low = numpy.where(below, middle, low)
+            high = numpy.where(below, high, middle)
+        return (low + high) / 2
+
+    def parameters(self) -> dict:
+        """
+        :return: Number of phases and rate of each
+        """
+        return {"k": self.k, "rate": self.phase_rate}
+
+
+class Hyperexponential(Distribution):
+    """
+    Mixture of exponential distributions, the phase drawn from an alias table
+    """
+
+    UNIFORMS = 2
+
+    def __init__(self, probabilities: list, rates: list):
+        """
+        Initialisation
+        :param probabilities: Probability of each phase
+        :param rates: Rate of each phase
+        """
+        self.probabilities = numpy.asarray(probabilities, dtype=float) / sum(probabilities)
+        self.rates = numpy.asarray(rates, dtype=float)
+        self.keep, self.aliases = Distribution.alias(self.probabilities)
+
+    def mean(self) -> float:
+        """
+        :return: Mean of the phase means weighted by their probabilities
+        """
+        return float((self.probabilities / self.rates).sum())
+
+    def sample(self, uniforms: numpy.ndarray) -> numpy.ndarray:
+        """
+        Draw the phase from the alias table with the first uniform and invert its exponential with the second
+        :param uniforms: Array of uniforms, two columns
+        :return: Array of draws
+        """
+        phases = Distribution.category(uniforms[:, 0], self.keep, self.aliases)
+        return -numpy.log1p(-uniforms[:, 1]) / self.rates[phases]
+
+    def parameters(self) -> dict:
+        """
+        :return: Probability and rate of each phase
+        """
+        return {"probabilities": self.probabilities.tolist(), "rates": self.rates.tolist()}
+
+
+class Empirical(Distribution):
+    """
+    Distribution of a histogram of measured times, the bin drawn from an alias table and the time
+    uniformly within it
+    """
+
+    UNIFORMS = 2
+
+    def __init__(self, edges: list, counts: list):
+        """
+        Initialisation
+        :param edges: Bin edges, one more than the counts
+        :param counts: Number of measurements in each bin
+        """
+        self.edges = numpy.asarray(edges, dtype=float)
+        self.counts = numpy.asarray(counts, dtype=float)
+        if len(self.edges) != len(self.counts) + 1:
+            raise ValueError("A histogram needs one more edge than counts")
+        self.keep, self.aliases = Distribution.alias(self.counts)
+
+    def histogram(values, bins: int = 64) -> "Empirical":
+        """
+        Build from measured times
+        :param values: Measured times
+        :param bins: Number of bins
+        :return: Empirical distribution
+        """
+        counts, edges = numpy.histogram(values, bins)
+        return Empirical(edges, counts)
+
+    def load(path: str) -> "Empirical":
+        """
+        Build from a CSV file of bins, each row the lower edge, upper edge and count of a bin
+        :param path: File of contiguous bins in increasing order
+        :return: Empirical distribution
+        """
+        rows = numpy.loadtxt(path, delimiter=",", ndmin=2)
+        return Empirical(numpy.append(rows[:, 0], rows[-1, 1]), rows[:, 2])
+
+    def mean(self) -> float:
+        """
+        :return: Mean of the bin centres weighted by their counts
+        """
+        centres = (self.edges[:-1] + self.edges[1:]) / 2
+        return float((centres * self.counts).sum() / self.counts.sum())
+
+    def sample(self, uniforms: numpy.ndarray) -> numpy.ndarray:
+        """
+        Draw the bin from the alias table with the first uniform and place the draw in it with the second
+        :param uniforms: Array of uniforms, two columns
+        :return: Array of draws
+        """
+        bins = Distribution.category(uniforms[:, 0], self.keep, self.aliases)
+        return self.edges[bins] + uniforms[:, 1] * (self.edges[bins + 1] - self.edges[bins])
+
+    def parameters(self) -> dict:
+        """
+        :return: Bin edges and counts of the histogram
+        """
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist()}
@@ -1,5 +1,5 @@
-from numpy import log
-import random
+from Distributions import Distribution
+from Variates import Variates
 
 
 class Event:
@@ -7,27 +7,68 @@ class Event:
     Class representing an event in the simulation
     """
 
+    __slots__ = ("kind", "arrival_time", "departure_time", "key", "server_id", "call_id")
+
+    # Kinds of event
+    ARRIVAL = 0
+    DEPARTURE = 1
+    KINDS = {"arrival": ARRIVAL, "departure": DEPARTURE}
+
     # Arrival rate of events
     ARRIVAL_RATE = 0.1
     # Departure rate of events
     DEPARTURE_RATE = 0.01
+    # Source of random variates shared by events
+    VARIATES = Variates()
 
-    def exponential(mean: float) -> float:
+    def draw(rate, stream: str = "arrival", variates: Variates = None) -> float:
         """
-        Calc exponential distribution around given mean
+        Draw an inter-arrival or holding time
+        :param rate: Rate of exponential distribution, or Distribution
+        :param stream: Name of variate stream to draw from
+        :param variates: Variate source, shared class source if None
         """
-        return - (log(random.random()) / mean)
+        if isinstance(rate, Distribution):
+            return (variates or Event.VARIATES).sample(stream, rate)
+        return (variates or Event.VARIATES).exponential(stream, rate)
 
-    def __init__(self, event_type: str, time: float):
+    def __init__(self, event_type, time: float, rate: float = None, variates: Variates = None):
         """
         Initialisation
-        :param event_type: Type of event
+        :param event_type: Type of event, name or kind
+        :param time: Time of creation
+        :param rate: Arrival rate or inter-arrival Distribution, class arrival rate if None
+        :param variates: Variate source, shared class source if None
+        """
+        self.kind = Event.KINDS[event_type.lower()] if isinstance(event_type, str) else event_type
+        self.begin(time + Event.draw(Event.ARRIVAL_RATE if rate is None else rate, "arrival", variates))
+
+    def renew(self, time: float, rate: float = None, variates: Variates = None):
+        """
+        Reuse a finished event as the next arrival, instead of allocating a new one
         :param time: Time of creation
+        :param rate: Arrival rate or inter-arrival Distribution, class arrival rate if None
+        :param variates: Variate source, shared class source if None
         """
+        self.kind = Event.ARRIVAL
+        self.begin(time + Event.draw(Event.ARRIVAL_RATE if rate is None else rate, "arrival", variates))
 
-        self.event_type = event_type
-        self.arrival_time = time + Event.exponential(Event.ARRIVAL_RATE)
-        self.departure_time = self.arrival_time + Event.exponential(Event.DEPARTURE_RATE)
+    def begin(self, time: float):
+        """
+        Set arrival time, keeping the sort key in step
+        :param time: Arrival time
+        """
+        self.arrival_time = time
+        self.key = time
+        # Holding time is only drawn once a server is assigned
+        self.departure_time = None
+
+    @property
+    def event_type(self) -> str:
+        """
+        :return: Name of the kind of event
+        """
+        return "arrival" if self.kind == Event.ARRIVAL else "Departure"
 
     def __str__(self) -> str:
         """
@@ -39,9 +80,7 @@ class Event:
         """
         :return: Time value
         """
-        if self.event_type == "arrival":
-            return self.arrival_time
-        return self.departure_time
+        return self.key
 
     def service_time(self) -> float:
         """
@@ -50,14 +89,19 @@ class Event:
         """
         return self.departure_time - self.arrival_time
 
-    def served_by(self, server_id=None):
+    def served_by(self, server_id=None, rate: float = None, variates: Variates = None):
         """
         Return ID of allocated server or assign the server
         :param server_id: Server to assign task to
+        :param rate: Departure rate or holding time Distribution, class departure rate if None
+        :param variates: Variate source, shared class source if None
         :return: Server ID or None
         """
         if server_id:
-            self.event_type = "Departure"
+            self.kind = Event.DEPARTURE
             self.server_id = server_id
+            self.departure_time = self.arrival_time + Event.draw(self.DEPARTURE_RATE if rate is None else rate,
+                                                                 "departure", variates)
+            self.key = self.departure_time
             return
         return self.server_id
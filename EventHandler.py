@@ -1,4 +1,8 @@
+from heapq import heappush, heappop
+from itertools import count
+
 from Event import Event
+from Statistics import Statistics
 
 
 class EventHandler:
@@ -6,44 +10,87 @@ class EventHandler:
     Class to manage events of the simulation
     """
 
-    def __init__(self):
+    def __init__(self, retain: bool = False):
         """
         Initialisation
+        :param retain: Keep every departed and blocked event, for debugging
         """
         self.upcoming = []
-        self.departed = []
-        self.blocked = []
+        self.sequence = count()
+
+        # Finished events are only kept on request, statistics are always streamed
+        self.retain = retain
+        self.departed = [] if retain else None
+        self.blocked = [] if retain else None
+
+        self.departures = Statistics()
+        self.blocked_number = 0
+
+        # Finished events waiting to be reused as new arrivals
+        self.pool = []
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the insertion counter by its position, as counters themselves do not pickle portably
+        :return: State of handler
+        """
+        state = dict(self.__dict__)
+        state["sequence"] = next(self.sequence)
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Restore state of handler
+        :param state: State from __getstate__
+        """
+        self.__dict__.update(state)
+        self.sequence = count(state["sequence"])
+
+    def __len__(self) -> int:
+        """
+        :return: Number of upcoming events
+        """
+        return len(self.upcoming)
 
     def add(self, event: Event):
         """
-        Add event to handler
+        Add event to handler, events with equal times are handled in order of addition
         :param event: Event to add
         """
-        for i, e in enumerate(self.upcoming):
-            if e.time() > event.time():
-                self.upcoming.insert(i, event)
-                return
-        self.upcoming.append(event)
+        heappush(self.upcoming, (event.key, next(self.sequence), event))
 
     def depart(self, event: Event):
         """
         Place departed event
         :param event: Event departing
         """
-        self.departed.append(event)
+        self.departures.add(event.departure_time - event.arrival_time)
+        if self.retain:
+            self.departed.append(event)
+        else:
+            self.pool.append(event)
 
     def block(self, event: Event):
         """
         Place blocked event
         :param event: Event being blocked
         """
-        self.blocked.append(event)
+        self.blocked_number += 1
+        if self.retain:
+            self.blocked.append(event)
+        else:
+            self.pool.append(event)
+
+    def recycle(self) -> Event:
+        """
+        Take a finished event for reuse
+        :return: Finished event, or None if there is none
+        """
+        return self.pool.pop() if self.pool else None
 
     def next(self) -> Event:
         """
         Get next event to be handled and remove from list
         :return: Next event to be handled
         """
-        e = self.upcoming[0]
-        self.upcoming = self.upcoming[1:]
-        return e
+        return heappop(self.upcoming)[2]
@@ -1,5 +1,6 @@
 from EventHandler import EventHandler
 from EventVariant import EventVariant
+from Variates import Variates
 
 
 class EventHandlerVariant(EventHandler):
@@ -7,25 +8,37 @@ class EventHandlerVariant(EventHandler):
     Variation of the EventHandler with modifications to accept two different paths.
     """
 
-    def __init__(self):
+    def __init__(self, retain: bool = False):
         """
         Initialisation
+        :param retain: Keep every departed and blocked event, for debugging
         """
-        self.upcoming = []
-        self.departed = []
-        self.blocked_handover = []
-        self.blocked_newcall = []
+        super().__init__(retain)
+        self.blocked_handover = [] if retain else None
+        self.blocked_newcall = [] if retain else None
+        # Blocked events per path ID
+        self.blocked_classes = [0, 0]
 
-    def start(self):
+    @property
+    def blocked_paths(self) -> dict:
+        """
+        :return: Blocked events per path name
+        """
+        return dict(zip(EventVariant.PATHS, self.blocked_classes))
+
+    def start(self, rates: dict = None, variates: Variates = None):
         """
         Add event of each type to event list
+        :param rates: Arrival rate of each path, class priorities if None
+        :param variates: Variate source, shared class source if None
         """
-        arrivals = [EventVariant("handover", "arrival", 0), EventVariant("newcall", "arrival", 0)]
+        rates = rates or EventVariant.PRIORITIES
+        arrivals = [EventVariant("handover", "arrival", 0, rates["handover"], variates),
+                    EventVariant("newcall", "arrival", 0, rates["newcall"], variates)]
         start_time = min([arrivals[0].time(), arrivals[1].time()])
 
         for e in arrivals:
-            e.arrival_time = e.arrival_time - start_time
-            e.departure_time = e.departure_time - start_time
+            e.begin(e.arrival_time - start_time)
             self.add(e)
 
     def block(self, event: EventVariant):
@@ -33,7 +46,11 @@ class EventHandlerVariant(EventHandler):
         Block function to ensure event stored in correct list
         :param event: Event to be blocked
         """
-        if event.path == "handover":
+        self.blocked_number += 1
+        self.blocked_classes[event.path_id] += 1
+        if not self.retain:
+            self.pool.append(event)
+        elif event.path_id == EventVariant.HANDOVER:
             self.blocked_handover.append(event)
         else:
             self.blocked_newcall.append(event)
@@ -1,23 +1,55 @@
 from Event import Event
+from Variates import Variates
 
 
 class EventVariant(Event):
     """
     Variation of Event that adds a path to differentiate between new call and handover
     """
+
+    __slots__ = ("path_id",)
+
+    # Paths, indexed by path ID
+    HANDOVER = 0
+    NEWCALL = 1
+    PATHS = ("handover", "newcall")
+
     # Arrival rates for different paths
     PRIORITIES = {"handover": 0.1, "newcall": 0.1}
     # Departure rate of events
     DEPARTURE_RATE = 0.01
 
-    def __init__(self, path: str, event_type: str, time: float):
+    def __init__(self, path, event_type, time: float, rate: float = None, variates: Variates = None):
         """
         Initialisation
-        :param path: handover or newcall
-        :param event_type: type of event
+        :param path: handover or newcall, by name or ID
+        :param event_type: type of event, name or kind
         :param time: time of creation
+        :param rate: Arrival rate or inter-arrival Distribution of path, class priority if None
+        :param variates: Variate source, shared class source if None
+        """
+        self.path_id = EventVariant.PATHS.index(path) if isinstance(path, str) else path
+        self.kind = Event.KINDS[event_type.lower()] if isinstance(event_type, str) else event_type
+        self.begin(time + Event.draw(EventVariant.PRIORITIES[self.path] if rate is None else rate,
+                                     self.path, variates))
+
+    def renew(self, time: float, rate: float = None, variates: Variates = None, path: int = None):
+        """
+        Reuse a finished event as the next arrival, instead of allocating a new one
+        :param time: Time of creation
+        :param rate: Arrival rate or inter-arrival Distribution of path, class priority if None
+        :param variates: Variate source, shared class source if None
+        :param path: Path ID of the new arrival, unchanged if None
+        """
+        if path is not None:
+            self.path_id = path
+        self.kind = Event.ARRIVAL
+        self.begin(time + Event.draw(EventVariant.PRIORITIES[self.path] if rate is None else rate,
+                                     self.path, variates))
+
+    @property
+    def path(self) -> str:
+        """
+        :return: Name of path
         """
-        self.path = path
-        self.event_type = event_type
-        self.arrival_time = time + Event.exponential(EventVariant.PRIORITIES[path])
-        self.departure_time = self.arrival_time + Event.exponential(EventVariant.DEPARTURE_RATE)
+        return EventVariant.PATHS[self.path_id]
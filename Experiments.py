@@ -0,0 +1,240 @@
+from argparse import ArgumentParser
+from csv import writer
+from os import makedirs
+from os.path import join
+
+import numpy
+
+from Analytic import Analytic
+from M1M2MCC import M1M2MCC
+from MMCC import MMCC
+from ResultCache import ResultCache
+from Sweep import Sweep
+
+
+class Experiments:
+    """
+    Headless runs of the configured experiments, producing columns of results
+    """
+
+    # Experiments run for each model name given on the command line
+    MODELS = {"mmcc": ["arrival_range"], "m1m2mcc": ["handover_range", "call_range"]}
+
+    def __init__(self, workers: int = None, seed=None, arrival_total: int = 10000, replications: int = 1,
+                 common: bool = False, antithetic: bool = False, control: bool = False, cache: ResultCache = None,
+                 sensitivity: bool = False):
+        """
+        Initialisation
+        :param workers: Number of processes, all cores if None
+        :param seed: Integer seed of the sweeps, unseeded if None
+        :param arrival_total: Number of events of each run
+        :param replications: Replications at each point
+        :param common: Drive every point with common random numbers
+        :param antithetic: Run replications as antithetic pairs
+        :param control: Adjust blocking with the analytic control variate
+        :param cache: Cache results of runs are reused from and stored in, or None
+        :param sensitivity: Estimate the derivatives of blocking with respect to rates and threshold in each run
+        """
+        self.workers = workers
+        self.seed = seed
+        self.arrival_total = arrival_total
+        self.options = {"replications": replications, "common": common, "antithetic": antithetic,
+                        "control": control, "directory": cache}
+        # Only passed when set, so runs without it keep their cache addresses
+        if sensitivity:
+            self.options["sensitivity"] = True
+
+    def columns(results: numpy.ndarray, **extra) -> dict:
+        """
+        Turn a sweep result into named columns
+        :param results: Structured array from Sweep
+        :param extra: Further columns
+        :return: Dictionary of column name to array
+        """
+        columns = {name: results[name] for name in results.dtype.names}
+        columns.update({name: numpy.asarray(values) for name, values in extra.items()})
+        return columns
+
+    def best(values, target: float) -> int:
+        """
+        :param values: Blocking probabilities in sweep order
+        :param target: Blocking target
+        :return: Index of the last value under the target, 0 if none is
+        """
+        under = numpy.flatnonzero(numpy.asarray(values) < target)
+        return int(under[-1]) if len(under) else 0
+
+    def arrival_range(self) -> dict:
+        """
+        M/M/C/C blocking and utilisation over arrival rates
+        :return: Columns of results
+        """
+        servers, departure_rate = 16, 0.01
+        arrival_range = numpy.linspace(0.01, 0.1, 100)
+        results = Sweep(MMCC, self.workers).run({"arrival_rate": arrival_range}, seed=self.seed, **self.options,
+                                                server_number=servers, arrival_total=self.arrival_total,
+                                                departure_rate=departure_rate)
+        return Experiments.columns(
+            results, expected_blocking=Analytic.erlang_b(servers, arrival_range, departure_rate),
+            expected_utilisation=Analytic.server_utilisation(servers, arrival_range, departure_rate))
+
+    def handover_range(self) -> dict:
+        """
+        M1/M2/M/C/C aggregated blocking over handover rates
+        :return: Columns of results
+        """
+        handover_range = numpy.geomspace(0.000001, 0.1, 100)
+        results = Sweep(M1M2MCC, self.workers).run({"handover_rate": handover_range}, seed=self.seed, **self.options,
+                                                   total_servers=16, arrival_total=self.arrival_total,
+                                                   threshold=2, newcall_rate=0.1, departure_rate=0.01)
+        return Experiments.columns(
+            results, expected_blocking=Analytic.aggregated_blocking(16, 2, handover_range, 0.1, 0.01))
+
+    def call_range(self) -> dict:
+        """
+        M1/M2/M/C/C aggregated blocking over new call rates
+        :return: Columns of results
+        """
+        call_range = numpy.linspace(0.01, 0.1, 100)
+        results = Sweep(M1M2MCC, self.workers).run({"newcall_rate": call_range}, seed=self.seed, **self.options,
+                                                   total_servers=16, arrival_total=self.arrival_total,
+                                                   threshold=2, handover_rate=0.03, departure_rate=0.01)
+        return Experiments.columns(
+            results, expected_blocking=Analytic.aggregated_blocking(16, 2, 0.03, call_range, 0.01))
+
+    def report(name: str, columns: dict):
+        """
+        Print the best run of an experiment
+        :param name: Experiment name
+        :param columns: Columns of results
+        """
+        blocking = columns["blocking_probability"]
+
+        if name == "arrival_range":
+            index = Experiments.best(blocking, 0.01)
+            print("Values for run on best arrival rate:")
+            print("\tEvents Handled :")
+            print("\t\tArrivals:", columns["arrivals"][index])
+            print("\t\tIncomplete:", columns["incomplete"][index])
+            print("\t\tDepartures:", columns["departed"][index])
+            print("\t\tBlocked:", columns["blocked"][index])
+            print("\tBlocking rate:", blocking[index])
+            print("\tServer Utilisation:", columns["server_utilisation"][index])
+            print()
+
+            difference = blocking - columns["expected_blocking"]
+            print("For blocking rate below 0.01")
+            print("\tArrival rate:", columns["arrival_rate"][index])
+            print("\tBlocking probability:", blocking[index])
+            print("\tVariance from predictions:", difference.mean())
+
+        elif name == "call_range":
+            index = Experiments.best(blocking, 0.02)
+            print("Values from run on best proposed new call arrival rate:")
+            print("\tEvents Handled ::")
+            print("\t\tArrivals:", columns["arrivals"][index])
+            print("\t\t\tOf which handovers:", columns["arrivals_handover"][index])
+            print("\t\t\tOf which new calls:", columns["arrivals_newcall"][index])
+            print("\t\tIncomplete:", columns["incomplete"][index])
+            print("\t\tDepartures:", columns["departed"][index])
+            print("\t\tBlocked handovers:", columns["blocked_handover"][index])
+            print("\t\tBlocked new calls:", columns["blocked_newcall"][index])
+            print("\tBlocking rate:", blocking[index])
+            print("\tServer Utilisation:", columns["server_utilisation"][index])
+            print()
+
+            print("For Aggregated blocking rate below 0.02:")
+            print("\tCall arrival value:", columns["newcall_rate"][index])
+            print("\tBlocking value:", blocking[index])
+
+    def write(columns: dict, path: str):
+        """
+        Write columns as .npz and .csv, and as .parquet when pyarrow is installed
+        :param columns: Columns of results
+        :param path: Output path without extension
+        """
+        numpy.savez(path + ".npz", **columns)
+
+        names = list(columns)
+        with open(path + ".csv", "w", newline="") as f:
+            out = writer(f)
+            out.writerow(names)
+            out.writerows(zip(*(columns[name].tolist() for name in names)))
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return
+        pyarrow.parquet.write_table(pyarrow.table(columns), path + ".parquet")
+
+    def read(path: str) -> dict:
+        """
+        Read columns written by write
+        :param path: Output path without extension
+        :return: Columns of results
+        """
+        with numpy.load(path + ".npz") as data:
+            return {name: data[name] for name in data.files}
+
+    def main(arguments: list = None):
+        """
+        Command line entry point
+        :param arguments: Command line arguments, sys.argv if None
+        """
+        parser = ArgumentParser(description="Run the simulation experiments headless and write columnar results")
+        parser.add_argument("experiments", nargs="+",
+                            choices=sorted(Experiments.MODELS) + sorted(sum(Experiments.MODELS.values(), [])),
+                            help="Model names run all their experiments")
+        parser.add_argument("--output", default="results", help="Directory results are written to")
+        parser.add_argument("--workers", type=int, help="Number of processes, all cores by default")
+        parser.add_argument("--seed", type=int, help="Seed of the sweeps")
+        parser.add_argument("--arrivals", type=int, default=10000, help="Number of events of each run")
+        parser.add_argument("--replications", type=int, default=1, help="Replications at each point")
+        parser.add_argument("--common", action="store_true", help="Use common random numbers across points")
+        parser.add_argument("--antithetic", action="store_true", help="Run replications as antithetic pairs")
+        parser.add_argument("--control", action="store_true", help="Adjust blocking with the analytic control variate")
+        parser.add_argument("--sensitivity", action="store_true",
+                            help="Estimate derivatives of blocking with respect to rates and threshold")
+        parser.add_argument("--cache", help="Directory of the result cache seeded runs are reused from")
+        parser.add_argument("--cache-size", type=float, default=256, help="Bound on the cache size in megabytes")
+        parser.add_argument("--load", action="store_true", help="Plot or report stored results instead of running")
+        parser.add_argument("--plot", action="store_true", help="Show figures")
+        parser.add_argument("--figures", help="Directory figures are saved to, without showing them")
+        arguments = parser.parse_args(arguments)
+        # Unseeded runs draw fresh numbers each time, so reusing them would hide that
+        if arguments.cache and arguments.seed is None:
+            parser.error("--cache needs --seed")
+        # Threshold derivatives rerun each point on the same random numbers
+        if arguments.sensitivity and arguments.seed is None:
+            parser.error("--sensitivity needs --seed")
+
+        names = []
+        for name in arguments.experiments:
+            names.extend(Experiments.MODELS.get(name, [name]))
+
+        experiments = Experiments(arguments.workers, arguments.seed, arguments.arrivals, arguments.replications,
+                                  arguments.common, arguments.antithetic, arguments.control,
+                                  ResultCache(arguments.cache, int(arguments.cache_size * 2**20))
+                                  if arguments.cache else None, arguments.sensitivity)
+        makedirs(arguments.output, exist_ok=True)
+        results = {}
+        for name in names:
+            path = join(arguments.output, name)
+            if arguments.load:
+                results[name] = Experiments.read(path)
+            else:
+                results[name] = getattr(experiments, name)()
+                Experiments.write(results[name], path)
+            Experiments.report(name, results[name])
+
+        # Plotting pulls in matplotlib, so it is only imported when asked for
+        if arguments.plot or arguments.figures:
+            from Plots import Plots
+            plots = Plots(arguments.figures)
+            for name in names:
+                getattr(plots, name)(results[name])
+
+
+if __name__ == "__main__":
+    Experiments.main()
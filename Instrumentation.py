@@ -0,0 +1,165 @@
+from time import perf_counter
+
+
+class RunStats:
+    """
+    Hot-path measurements of an instrumented run
+    """
+
+    def __init__(self, progress=None, progress_interval: int = 10000):
+        """
+        Initialisation
+        :param progress: Callable given these stats every progress_interval events, or None
+        :param progress_interval: Events between progress calls
+        """
+        self.events = 0
+        self.time = {"event_list": 0.0, "servers": 0.0, "sampling": 0.0}
+        self.peak_pending = 0
+        self.peak_busy = 0
+        self.simulation_time = 0.0
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.start = perf_counter()
+        self.elapsed = 0.0
+
+    def events_per_second(self) -> float:
+        """
+        :return: Events handled per second of wall time
+        """
+        elapsed = self.elapsed or (perf_counter() - self.start)
+        return self.events / elapsed if elapsed else 0.0
+
+    def report(self) -> dict:
+        """
+        :return: Dictionary of the measurements
+        """
+        report = {"events": self.events,
+                  "elapsed": self.elapsed or (perf_counter() - self.start),
+                  "events_per_second": self.events_per_second(),
+                  "peak_pending": self.peak_pending,
+                  "peak_busy": self.peak_busy,
+                  "simulation_time": self.simulation_time}
+        report.update({"time_" + name: seconds for name, seconds in self.time.items()})
+        return report
+
+
+class Proxy:
+    """
+    Wrapper of a simulation component that forwards every attribute it does not define to the component
+    """
+
+    def __init__(self, target):
+        """
+        Initialisation
+        :param target: Component being wrapped
+        """
+        self.target = target
+
+    def __getattr__(self, name: str):
+        """
+        Forward everything else to the target. Unpickling looks up attributes before the target is
+        restored, which must fail rather than recurse
+        """
+        if "target" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["target"], name)
+
+
+class Timed(Proxy):
+    """
+    Proxy that forwards to a simulation component, timing the listed methods
+    """
+
+    def __init__(self, target, category: str, stats: RunStats, methods: tuple):
+        """
+        Initialisation
+        :param target: Component being wrapped
+        :param category: Key of stats.time the methods are charged to
+        :param stats: Measurements of the run
+        :param methods: Names of the methods to time
+        """
+        super().__init__(target)
+        for name in methods:
+            setattr(self, name, self.timed(getattr(target, name), category, stats))
+
+    def timed(self, method, category: str, stats: RunStats):
+        """
+        Wrap a method so its wall time is added to a category
+        :param method: Bound method of the target
+        :param category: Key of stats.time
+        :param stats: Measurements of the run
+        :return: Wrapped method
+        """
+        time = stats.time
+
+        def wrapper(*arguments):
+            start = perf_counter()
+            result = method(*arguments)
+            time[category] += perf_counter() - start
+            return result
+        return wrapper
+
+
+class TimedEvents(Timed):
+    """
+    Proxy of an EventHandler that also counts events, tracks the pending peak and reports progress
+    """
+
+    def __init__(self, target, stats: RunStats):
+        """
+        Initialisation
+        :param target: EventHandler being wrapped
+        :param stats: Measurements of the run
+        """
+        super().__init__(target, "event_list", stats, ("block", "depart", "recycle"))
+        self.stats = stats
+        self.add_event = self.timed(target.add, "event_list", stats)
+        self.next_event = self.timed(target.next, "event_list", stats)
+
+    def add(self, event):
+        """
+        Add event, tracking the peak number of pending events
+        :param event: Event to add
+        """
+        self.add_event(event)
+        if len(self.target.upcoming) > self.stats.peak_pending:
+            self.stats.peak_pending = len(self.target.upcoming)
+
+    def next(self):
+        """
+        Get next event, counting it and calling the progress callback every interval
+        :return: Next event to be handled
+        """
+        event = self.next_event()
+        stats = self.stats
+        stats.events += 1
+        stats.simulation_time = event.key
+        if stats.progress is not None and stats.events % stats.progress_interval == 0:
+            stats.progress(stats)
+        return event
+
+
+class TimedServers(Timed):
+    """
+    Proxy of Servers that also tracks the occupancy high-water mark
+    """
+
+    def __init__(self, target, stats: RunStats):
+        """
+        Initialisation
+        :param target: Servers being wrapped
+        :param stats: Measurements of the run
+        """
+        super().__init__(target, "servers", stats, ("deallocate", "is_free", "busy_count"))
+        self.stats = stats
+        self.allocate_server = self.timed(target.allocate, "servers", stats)
+
+    def allocate(self) -> int:
+        """
+        Allocate server, tracking the peak number busy
+        :return: Server ID
+        """
+        server = self.allocate_server()
+        if self.target.busy_number > self.stats.peak_busy:
+            self.stats.peak_busy = self.target.busy_number
+        return server
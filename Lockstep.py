@@ -0,0 +1,144 @@
+import numpy
+
+from Event import Event
+from EventVariant import EventVariant
+from Sweep import Sweep
+from Variates import Variates
+
+
+class Lockstep:
+    """
+    Simulates a whole sweep of M1/M2/M/C/C birth-death chains at once, one NumPy lane per sweep point
+    """
+
+    # Number of steps whose uniform draws are generated together
+    BLOCK_SIZE = 256
+
+    def run(self, total_servers, arrival_total: int, threshold, handover_rate=None, newcall_rate=None,
+            departure_rate=None, seed=None) -> numpy.ndarray:
+        """
+        Run every lane until it has seen the number of arrivals, parameters are broadcast against each other
+        :param total_servers: Number of servers of each lane
+        :param arrival_total: Number of events per lane
+        :param threshold: Servers reserved for handover calls in each lane
+        :param handover_rate: Arrival rate of handovers of each lane, class priority if None
+        :param newcall_rate: Arrival rate of new calls of each lane, class priority if None
+        :param departure_rate: Departure rate of each lane, EventVariant.DEPARTURE_RATE if None
+        :param seed: Integer seed or SeedSequence, shared class source if None
+        :return: Structured array with the same fields as MarkovM1M2MCC.summary, one record per lane
+        """
+        variates = EventVariant.VARIATES if seed is None else Variates(seed)
+        generator = variates.generator("transition")
+
+        handover_rate = EventVariant.PRIORITIES["handover"] if handover_rate is None else handover_rate
+        newcall_rate = EventVariant.PRIORITIES["newcall"] if newcall_rate is None else newcall_rate
+        departure_rate = EventVariant.DEPARTURE_RATE if departure_rate is None else departure_rate
+        servers, threshold, handover, newcall, departure = numpy.broadcast_arrays(
+            numpy.asarray(total_servers, dtype=numpy.int64), numpy.asarray(threshold, dtype=numpy.int64),
+            numpy.asarray(handover_rate, dtype=float), numpy.asarray(newcall_rate, dtype=float),
+            numpy.asarray(departure_rate, dtype=float))
+        lanes = servers.size
+        servers, shared = servers.ravel(), (servers - threshold).ravel()
+        handover, arrival, departure = handover.ravel(), (handover + newcall).ravel(), departure.ravel()
+
+        # Per lane tables over states, flattened with a row of width C+1 per lane and one final row
+        # that lanes are parked in once finished, where every step is a departure that does not move
+        width = int(servers.max()) + 1
+        states = numpy.arange(width)
+        rate = arrival[:, None] + states * departure[:, None]
+        handover_share = numpy.zeros((lanes + 1, width))
+        arrival_share = numpy.zeros((lanes + 1, width))
+        handover_share[:lanes] = handover[:, None] / rate
+        arrival_share[:lanes] = arrival[:, None] / rate
+        sojourn = 1 / rate
+
+        # Change of state for each state and outcome, a handover, a new call or a departure
+        moves = numpy.zeros((lanes + 1, width, 3), dtype=numpy.int64)
+        moves[:lanes, :, 0] = states < servers[:, None]
+        moves[:lanes, :, 1] = states < shared[:, None]
+        moves[:lanes, :, 2] = -1
+        moves[lanes] = 0
+        handover_share, arrival_share, moves = handover_share.ravel(), arrival_share.ravel(), moves.ravel()
+
+        # State of every lane, as its row offset and busy servers
+        base = numpy.arange(lanes) * width
+        parked = lanes * width
+        k = numpy.zeros(lanes, dtype=numpy.int64)
+        final = numpy.zeros(lanes, dtype=numpy.int64)
+        arrivals_total = numpy.zeros(lanes, dtype=numpy.int64)
+        active = numpy.ones(lanes, dtype=bool)
+        visits = numpy.zeros((lanes + 1) * width * 3, dtype=numpy.int64)
+        cells = numpy.empty((Lockstep.BLOCK_SIZE, lanes), dtype=numpy.int64)
+        # Buffers reused by every step
+        flat, move = numpy.empty(lanes, dtype=numpy.int64), numpy.empty(lanes, dtype=numpy.int64)
+        share, outcome = numpy.empty(lanes), numpy.empty(lanes, dtype=bool)
+
+        while active.any():
+            # Each step only picks an outcome from the tables and records the state and outcome visited,
+            # counting is done once per block
+            for u, cell in zip(generator.random((Lockstep.BLOCK_SIZE, lanes)), cells):
+                numpy.add(base, k, out=flat)
+                numpy.multiply(flat, 3, out=cell)
+                numpy.greater_equal(u, handover_share.take(flat, out=share), out=outcome)
+                cell += outcome
+                numpy.greater_equal(u, arrival_share.take(flat, out=share), out=outcome)
+                cell += outcome
+                k += moves.take(cell, out=move)
+
+            # Lanes reaching the arrival total in the block keep only the steps up to that arrival
+            arriving = (cells % 3) < 2
+            counts = arrivals_total + numpy.cumsum(arriving, axis=0)
+            finishing = active & (counts[-1] >= arrival_total)
+            kept = numpy.ones_like(cells, dtype=bool)
+            if finishing.any():
+                lane = numpy.flatnonzero(finishing)
+                last = numpy.argmax(counts[:, lane] >= arrival_total, axis=0)
+                kept[:, lane] = numpy.arange(Lockstep.BLOCK_SIZE)[:, None] <= last
+                cell = cells[last, lane]
+                final[lane] = cell // 3 - base[lane] + moves[cell]
+                base[lane], k[lane] = parked, 0
+                active &= ~finishing
+            visits += numpy.bincount(cells[kept], minlength=visits.size)
+            arrivals_total = numpy.minimum(counts[-1], arrival_total)
+
+        visits = visits.reshape(lanes + 1, width, 3)[:lanes]
+        arrivals = visits[:, :, :2].sum(axis=1).T
+        blocked = numpy.stack((visits[:, :, 0] * (states >= servers[:, None]),
+                               visits[:, :, 1] * (states >= shared[:, None]))).sum(axis=2)
+        departures = visits[:, :, 2].sum(axis=1)
+        # Each visit holds the lane in its state for the expected sojourn time
+        occupancy = visits.sum(axis=2) * sojourn
+
+        simulation_time = occupancy.sum(axis=1)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            HFP = numpy.where(arrivals[0] > 0, blocked[0] / arrivals[0], 0)
+            CBP = numpy.where(arrivals[1] > 0, blocked[1] / arrivals[1], 0)
+        utilisation = (occupancy * states).sum(axis=1) / simulation_time
+
+        summaries = [{"arrivals": int(arrivals[0, i] + arrivals[1, i]),
+                      "departed": int(departures[i]),
+                      "blocked": int(blocked[0, i] + blocked[1, i]),
+                      "incomplete": int(final[i]),
+                      "simulation_time": float(simulation_time[i]),
+                      "blocking_probability": float(CBP[i] + 10 * HFP[i]),
+                      "server_utilisation": float(utilisation[i]),
+                      "arrivals_handover": int(arrivals[0, i]),
+                      "arrivals_newcall": int(arrivals[1, i]),
+                      "blocked_handover": int(blocked[0, i]),
+                      "blocked_newcall": int(blocked[1, i])} for i in range(lanes)]
+        return Sweep.table([{}] * lanes, summaries)
+
+    def run_mmcc(self, server_number, arrival_total: int, arrival_rate=None, departure_rate=None,
+                 seed=None) -> numpy.ndarray:
+        """
+        Run M/M/C/C lanes, as M1/M2/M/C/C lanes with no handovers or reserved servers
+        :param server_number: Number of servers of each lane
+        :param arrival_total: Number of events per lane
+        :param arrival_rate: Arrival rate of each lane, Event.ARRIVAL_RATE if None
+        :param departure_rate: Departure rate of each lane, Event.DEPARTURE_RATE if None
+        :param seed: Integer seed or SeedSequence, shared class source if None
+        :return: Structured array with the same fields as MarkovM1M2MCC.summary, one record per lane
+        """
+        return self.run(server_number, arrival_total, 0, 0.0,
+                        Event.ARRIVAL_RATE if arrival_rate is None else arrival_rate,
+                        Event.DEPARTURE_RATE if departure_rate is None else departure_rate, seed)
@@ -1,11 +1,11 @@
-from numpy import *
-from pylab import *
-from math import factorial
-
+from Analytic import Analytic
+from Distributions import Distribution
+from Event import Event
 from EventVariant import EventVariant
 from EventHandlerVariant import EventHandlerVariant
 from MMCC import MMCC
 from Servers import Servers
+from Variates import Variates
 
 
 class M1M2MCC(MMCC):
@@ -13,241 +13,177 @@ class M1M2MCC(MMCC):
     Class to simulate M1/M2/M/C/C system
     """
 
-    def run(self, total_servers: int, arrival_total: int, threshold: int):
+    PATHS = True
+    RATES = ("handover_rate", "newcall_rate")
+
+    def run(self, total_servers: int, arrival_total: int, threshold: int, *, retain: bool = False,
+            handover_rate: float = None, newcall_rate: float = None, departure_rate: float = None,
+            seed=None, precision: float = None, batch_size: int = 1000, warmup=None, start: str = "empty",
+            instrument: bool = False, progress=None, progress_interval: int = 10000,
+            checkpoint: str = None, checkpoint_interval: int = 100000, trace: str = None,
+            sensitivity: bool = False):
         """
         Modified run function that adds threshold value
         :param total_servers: Number of servers
         :param arrival_total: Number of events
         :param threshold: Servers reserved for handover calls
+        :param retain: Keep every departed and blocked event, for debugging
+        :param handover_rate: Arrival rate or inter-arrival Distribution of handovers, class priority if None
+        :param newcall_rate: Arrival rate or inter-arrival Distribution of new calls, class priority if None
+        :param departure_rate: Departure rate or holding time Distribution, EventVariant.DEPARTURE_RATE if None
+        :param seed: Integer seed, SeedSequence or Variates of the run, shared class source if None
+        :param precision: Relative half width of ABP at which to stop, arrival_total is then a cap
+        :param batch_size: Number of arrivals per batch of the sequential stopping rule
+        :param warmup: Arrivals discarded before statistics accumulate, or "mser" to choose by MSER
+        :param start: "empty" or "stationary" to start with busy servers drawn from the analytic distribution
+        :param instrument: Record hot-path measurements in self.stats
+        :param progress: Callable given self.stats every progress_interval events, implies instrument
+        :param progress_interval: Events between progress calls
+        :param checkpoint: File the run state is saved to every checkpoint_interval arrivals, or None
+        :param checkpoint_interval: Arrivals between checkpoints
+        :param trace: Binary file every admission, block and departure is recorded to, or None
+        :param sensitivity: Estimate the derivatives of ABP with respect to each rate from the same run, and
+        with respect to the threshold from a paired run on common random numbers, which needs a seed
         """
 
+        # Rates of this run
+        self.rates = {"handover": EventVariant.PRIORITIES["handover"] if handover_rate is None else handover_rate,
+                      "newcall": EventVariant.PRIORITIES["newcall"] if newcall_rate is None else newcall_rate}
+        self.path_rates = [self.rates[path] for path in EventVariant.PATHS]
+        self.departure_rate = EventVariant.DEPARTURE_RATE if departure_rate is None else departure_rate
+        self.variates = Variates.of(seed, EventVariant.VARIATES)
+        self.threshold = threshold
+        self.shared_servers = total_servers - threshold
+
+        # The threshold run is paired on common random numbers from the start of the same seed
+        if sensitivity:
+            if seed is None:
+                raise ValueError("Threshold sensitivity needs a seed for its paired run")
+            self.variates = Variates(self.variates.seed_sequence, self.variates.antithetic, common=True)
+
         # Setup servers, event handler and add first events
         self.servers = Servers(total_servers)
-        self.events = EventHandlerVariant()
-        self.events.start()
+        self.events = EventHandlerVariant(retain)
+        self.events.start(self.rates, self.variates)
 
         # Start counter and iteration
         self.arrival_number = 0
-        self.arrival = {"handover": 0, "newcall": 0}
-
-        while(sum(self.arrival_number) < arrival_total):
+        self.arrivals = [0, 0]
 
-            # Iterate to next event with handler and update sim time
-            current_event = self.events.next()
-            self.simulation_time = current_event.time()
+        self.execute(arrival_total, precision, batch_size, warmup, start, instrument, progress, progress_interval,
+                     checkpoint, checkpoint_interval, trace, sensitivity)
 
-            # If arrival, update counter and add to appropriate list
-            if current_event.event_type == "arrival":
-                priority = current_event.path
-                self.arrival_number += 1
-                self.arrival[priority] += 1
+    @property
+    def arrival(self) -> dict:
+        """
+        :return: Arrivals per path name
+        """
+        return dict(zip(EventVariant.PATHS, self.arrivals))
 
-                self.events.add(EventVariant(priority, "arrival", current_event.time()))
+    def next_arrival(self, event: EventVariant) -> EventVariant:
+        """
+        Create the arrival following an arrival on the same path, reusing a finished event when one is available
+        :param event: Arrival being handled
+        :return: Next arrival
+        """
+        path = event.path_id
+        recycled = self.events.recycle()
+        if recycled is None:
+            return EventVariant(path, Event.ARRIVAL, event.key, self.path_rates[path], self.variates)
+        recycled.renew(event.key, self.path_rates[path], self.variates, path)
+        return recycled
+
+    def arrival_rates(self) -> list:
+        """
+        :return: Arrival rate of each path
+        """
+        return self.path_rates
 
-                # Check server availability by priority and threshold
-                if (len(self.servers) > threshold) or (priority == "handover" and self.servers.is_free()):
-                    # Assign server to event
-                    current_event.served_by(self.servers.allocate())
-                    self.events.add(current_event)
-                    continue
+    def derivatives(self) -> dict:
+        """
+        Likelihood ratio estimates from the previous run, and the change in ABP per server reserved, by
+        rerunning one threshold up, or down from a threshold of every server, on the same random numbers
+        over the same arrivals, so the difference carries little of the noise of either run
+        :return: Derivative of ABP with respect to each rate and the threshold, by run parameter
+        """
+        derivatives = super().derivatives()
+        step = 1 if self.threshold < self.servers.server_number else -1
+        paired = type(self)()
+        paired.run(self.servers.server_number, self.arrival_number, self.threshold + step,
+                   handover_rate=self.rates["handover"], newcall_rate=self.rates["newcall"],
+                   departure_rate=self.departure_rate,
+                   seed=Variates(self.variates.seed_sequence, self.variates.antithetic, common=True),
+                   batch_size=self.batches.batch_size, warmup=self.warmup_arrivals or None, start=self.start)
+        derivatives["threshold"] = step * (paired.blocking_probability() - self.blocking_probability())
+        return derivatives
+
+    def admit(self, event: EventVariant) -> bool:
+        """
+        Count arrival by path and check server availability by priority and threshold
+        :param event: Arrival being handled
+        :return: True if event is given a server, else false
+        """
+        self.arrivals[event.path_id] += 1
+        return (self.servers.busy_number < self.shared_servers) or \
+            (event.path_id == EventVariant.HANDOVER and self.servers.is_free())
 
-                # Arrival has been blocked
-                self.events.block(current_event)
+    def batch_counts(self) -> tuple:
+        """
+        :return: Counters that batch values are computed from
+        """
+        return (self.arrivals[0], self.arrivals[1], self.events.blocked_classes[0], self.events.blocked_classes[1])
 
-            # If departure, free server and depart event
-            else:
-                self.servers.deallocate(current_event.served_by())
-                self.events.depart(current_event)
+    def batch_value(self, previous: tuple, current: tuple) -> float:
+        """
+        Aggregated blocking probability within a batch
+        :param previous: Counters at start of batch
+        :param current: Counters at end of batch
+        :return: ABP of the batch arrivals
+        """
+        handover, newcall, blocked_handover, blocked_newcall = (c - p for c, p in zip(current, previous))
+        HFP = blocked_handover / handover if handover else 0
+        CBP = blocked_newcall / newcall if newcall else 0
+        return CBP + (10 * HFP)
 
-    def blocking_probability(self):
+    def occupancy_blocking(self) -> float:
         """
-        Obtain aggregated blocking probability of previous run
-        :return: Blocking probability
+        Aggregated blocking probability of previous run by PASTA, new calls being blocked with the
+        shared servers busy and handovers with every server busy
+        :return: ABP
         """
+        CBP = self.occupancy.tail(self.shared_servers, self.origin.occupancy)
+        HFP = self.occupancy.tail(self.servers.server_number, self.origin.occupancy)
+        return CBP + (10 * HFP)
 
-        HFP = len(self.events.blocked_handover) / self.arrival["handover"] \
-            if self.arrival["handover"] else 0
+    def initial_occupancy(self):
+        """
+        Analytic stationary distribution of busy servers under the threshold, a Distribution taken at the
+        rate of its mean
+        :return: Probability of each number of busy servers
+        """
+        handover_rate, newcall_rate = (Distribution.rate_of(self.rates[path]) for path in EventVariant.PATHS)
+        return Analytic.occupancy(self.servers.server_number, self.servers.server_number - self.shared_servers,
+                                  handover_rate, newcall_rate, Distribution.rate_of(self.departure_rate))
 
-        CBP = len(self.events.blocked_newcall) / self.arrival["newcall"] \
-            if self.arrival["newcall"] else 0
+    def initial_call(self) -> EventVariant:
+        """
+        :return: Call placed in service before the run starts
+        """
+        return EventVariant(EventVariant.NEWCALL, Event.ARRIVAL, 0, self.rates["newcall"], self.variates)
 
-        return CBP + (10 * HFP)
+    def summary(self) -> dict:
+        """
+        Obtain counters and metrics of previous run
+        :return: Dictionary of run outcomes
+        """
+        summary = super().summary()
+        summary.update({"arrivals_handover": self.arrival["handover"],
+                        "arrivals_newcall": self.arrival["newcall"],
+                        "blocked_handover": self.events.blocked_paths["handover"],
+                        "blocked_newcall": self.events.blocked_paths["newcall"]})
+        return summary
 
 
 if __name__ == "__main__":
-
-    def expected_blocking_probability(server_number: int, threshold: int, handover_arrival_rate: float,  newcall_arrival_rate: float, departure_rate: float) -> float:
-        """
-        Calculate expected blocking probability via analytical methods
-        :param server_number: Number of servers
-        :param threshold: Servers reserved for handovers
-        :param handover_arrival_rate: Arrival rate of handover events
-        :param newcall_arrival_rate: Arrival rate of newcall events
-        :param departure_rate: Departure rate of events
-        :return: Expected blocking probability
-        """
-
-        combined_arrival_rate = handover_arrival_rate + newcall_arrival_rate
-        common_server_number = server_number - threshold
-
-        # Compute first sum of P_zero
-        P_zero_first = sum([(1/factorial(k)) *
-                            ((combined_arrival_rate/departure_rate)**k)
-                            for k in range(0, common_server_number+1)])
-
-        # Use a loop for second sum
-        P_zero_second = 0
-
-        for k in range(common_server_number + 1, server_number + 1):
-            a = 1/factorial(server_number - threshold)
-            b = (combined_arrival_rate/departure_rate)**(common_server_number)
-            c = 1/factorial(k - common_server_number)
-            d = (handover_arrival_rate/departure_rate)**(k-common_server_number)
-            P_zero_second += a*b*c*d
-
-        # Obtain P_zero
-        P_zero = (P_zero_first + P_zero_second)**(-1)
-
-        P_loss_newcall = sum([ computePk(k, server_number, threshold, P_zero, handover_arrival_rate, newcall_arrival_rate, departure_rate) for k in range(common_server_number, server_number+1)])
-
-        # Compute P_loss_handover
-        w = 1/factorial(server_number - threshold)
-        x = (combined_arrival_rate/departure_rate)**(common_server_number)
-        y = 1/factorial(threshold)
-        z = (handover_arrival_rate/departure_rate)**threshold
-        P_loss_handover = w*x*y*z*P_zero
-
-        expected_ABP = P_loss_newcall + 10 * P_loss_handover
-
-        return expected_ABP
-
-    def computePk(k: int, server_number: int, threshold: int, P_zero: double, handover_arrival_rate: float,  newcall_arrival_rate: float, departure_rate: float) -> float:
-        """
-        Compute Pk
-        :param k: k value
-        :param server_number: Number of servers
-        :param threshold: Servers reserved for handovers
-        :param P_zero: P_zero value
-        :param handover_arrival_rate:  Arrival rate of handover events
-        :param newcall_arrival_rate: Arrival rate of newcall events
-        :param departure_rate: Departure rate of events
-        :return: Pk
-        """
-
-        common_server_number = server_number - threshold
-        combined_arrival_rate = handover_arrival_rate + newcall_arrival_rate
-
-        if k <= common_server_number:
-            Pk = 1/factorial(k)*((combined_arrival_rate/departure_rate)**k)*P_zero
-            return Pk
-
-        a  = 1/factorial(server_number - threshold)
-        b  = (combined_arrival_rate/departure_rate)**common_server_number
-        c  = 1 / factorial(k - (common_server_number))
-        d  = (handover_arrival_rate/departure_rate)**(k - common_server_number)
-        Pk = a*b*c*d*P_zero
-        return Pk
-
-    matplotlib.pyplot.show()
-    machine = M1M2MCC()
-
-    # Initialise test parameters
-    handover_range = geomspace(0.000001, 0.1, 100)
-    EventVariant.PRIORITIES["newcall"] = 0.1
-    EventVariant.DEPARTURE_RATE = 0.01
-
-    # Outcome lists
-    simulation_blocking = []
-    simulation_utilisation = []
-
-    expected_blocking = []
-
-    simulation_arrival = []
-    simulation_incomplete = []
-    simulation_departed = []
-    simulation_handover_blocked = []
-    simulation_newcall_blocked = []
-    simulation_arrival_handover = []
-    simulation_arrival_newcall = []
-
-    for p in handover_range:
-        EventVariant.PRIORITIES["handover"] = p
-        machine.run(16, 10000, 2)
-
-        simulation_blocking.append(machine.blocking_probability())
-        simulation_utilisation.append(machine.server_utilisation())
-        expected_blocking.append(expected_blocking_probability(16, 2, p, 0.1, 0.01))
-
-    # Figure for handover range experiment
-    figure()
-    plot(handover_range, simulation_blocking, "b.", label="ABP blocking probability")
-    plot(handover_range, expected_blocking, "r--", label="Theoretical blocking percentage")
-    plot([handover_range[0], handover_range[-1]], [0.02]*2, \
-         'g--', label="Target probability of 0.02")
-    ylabel("ABP blocking probability")
-    xlabel("Handover arrival rate")
-    legend()
-    xlim(handover_range[0], handover_range[-1])
-    ylim(-0.005, 0.2)
-    xscale("log")
-    show(block=True)
-
-    call_range = linspace(0.01, 0.1, 100)
-    EventVariant.PRIORITIES["handover"] = 0.03
-    EventVariant.DEPARTURE_RATE = 0.01
-
-    simulation_blocking = []
-    expected_blocking2 = []
-    index, best_prob = 0, 0
-
-    for i, c in enumerate(call_range):
-        EventVariant.PRIORITIES["newcall"] = c
-        machine.run(16, 10000, 2)
-        prob = machine.blocking_probability()
-
-        if prob < 0.02: index, best_prob = i, prob
-
-        simulation_blocking.append(prob)
-        expected_blocking2.append(expected_blocking_probability(16, 2, 0.03, c, 0.01))
-
-        # Lists to hold outcomes for each value in arrival range
-        simulation_arrival.append(machine.arrival_number)
-        simulation_incomplete.append(machine.arrival_number - (len(machine.events.departed) + len(machine.events.blocked_handover) + len(machine.events.blocked_newcall)))
-        simulation_departed.append(len(machine.events.departed))
-        simulation_handover_blocked.append(len(machine.events.blocked_handover))
-        simulation_newcall_blocked.append(len(machine.events.blocked_newcall))
-        simulation_arrival_newcall.append(machine.arrival["newcall"])
-        simulation_arrival_handover.append(machine.arrival["handover"])
-
-    # Best run
-    print("Values from run on best proposed new call arrival rate:")
-    print("\tEvents Handled ::")
-    print("\t\tArrivals:", simulation_arrival[index])
-    print("\t\t\tOf which handovers:", simulation_arrival_handover[index])
-    print("\t\t\tOf which new calls:", simulation_arrival_newcall[index])
-    print("\t\tIncomplete:", simulation_incomplete[index])
-    print("\t\tDepartures:", simulation_departed[index])
-    print("\t\tBlocked handovers:", simulation_handover_blocked[index])
-    print("\t\tBlocked new calls:", simulation_newcall_blocked[index])
-
-    print("\tBlocking rate:", simulation_blocking[index])
-    print("\tServer Utilisation:", simulation_utilisation[index])
-    print()
-
-    print("For Aggregated blocking rate below 0.02:")
-    print("\tCall arrival value:", call_range[index])
-    print("\tBlocking value:", best_prob)
-
-    # Figure for arrival rate experiment
-    figure()
-    plot(call_range, simulation_blocking, "b.", label="ABP blocking probability")
-    plot(call_range, expected_blocking2, "r--", label="Theoretical blocking percentage")
-    plot([0.01, call_range[index]], [simulation_blocking[index]]*2, "g--", \
-         label="Setup with probability under 0.02")
-    plot([call_range[index]]*2, [-0.005, simulation_blocking[index]], "g--")
-    ylabel("ABP blocking probability")
-    xlabel("New call arrival rate")
-    xlim(0.01,0.1)
-    ylim(-0.005, 0.2)
-    legend()
-    show(block=True)
+    from Experiments import Experiments
+    Experiments.main(["m1m2mcc", "--plot", "--seed", "0", "--cache", ".cache"])
@@ -1,10 +1,24 @@
-from numpy import *
-from pylab import *
-from math import factorial
+from collections import namedtuple
+from os import replace
+from time import perf_counter
+import pickle
 
+import numpy
+
+from Analytic import Analytic
+from Distributions import Distribution
 from Event import Event
 from EventHandler import EventHandler
+from Instrumentation import RunStats, Timed, TimedEvents, TimedServers
+from Sensitivity import ScoredEvents, Sensitivity
 from Servers import Servers
+from Statistics import BatchMeans, Occupancy
+from Trace import TracedEvents, TraceWriter
+from Variates import Variates
+
+# State of a run at a batch boundary, the batch counters, arrivals, occupancy times as an array or None, and
+# cumulative scores when estimating sensitivities or None
+Snapshot = namedtuple("Snapshot", ("counts", "arrivals", "occupancy", "scores"))
 
 
 class MMCC:
@@ -12,44 +26,350 @@ class MMCC:
     Class to simulate M/M/C/C system
     """
 
-    def run(self, server_number: int, arrival_total: int):
+    # Batches needed before the sequential stopping rule may end a run
+    MIN_BATCHES = 10
+    # Growth of the batch count after which the stopping rule searches for the MSER truncation again
+    MSER_GROWTH = 1.1
+    # Whether calls of this model arrive on handover and new call paths
+    PATHS = False
+    # Run parameters of the arrival rates, in path order
+    RATES = ("arrival_rate",)
+
+    def run(self, server_number: int, arrival_total: int, *, retain: bool = False,
+            arrival_rate: float = None, departure_rate: float = None, seed=None,
+            precision: float = None, batch_size: int = 1000, warmup=None, start: str = "empty",
+            instrument: bool = False, progress=None, progress_interval: int = 10000,
+            checkpoint: str = None, checkpoint_interval: int = 100000, trace: str = None,
+            sensitivity: bool = False):
         """
         Run simulation with specified parameters
         :param server_number: Number of servers
         :param arrival_total: Number of events
+        :param retain: Keep every departed and blocked event, for debugging
+        :param arrival_rate: Arrival rate or inter-arrival Distribution of events, Event.ARRIVAL_RATE if None
+        :param departure_rate: Departure rate or holding time Distribution of events, Event.DEPARTURE_RATE if None
+        :param seed: Integer seed, SeedSequence or Variates of the run, shared class source if None
+        :param precision: Relative half width of blocking at which to stop, arrival_total is then a cap
+        :param batch_size: Number of arrivals per batch of the sequential stopping rule
+        :param warmup: Arrivals discarded before statistics accumulate, or "mser" to choose by MSER
+        :param start: "empty" or "stationary" to start with busy servers drawn from the analytic distribution
+        :param instrument: Record hot-path measurements in self.stats
+        :param progress: Callable given self.stats every progress_interval events, implies instrument
+        :param progress_interval: Events between progress calls
+        :param checkpoint: File the run state is saved to every checkpoint_interval arrivals, or None
+        :param checkpoint_interval: Arrivals between checkpoints
+        :param trace: Binary file every admission, block and departure is recorded to, or None
+        :param sensitivity: Estimate the derivatives of blocking with respect to each rate from the same run
         """
 
+        # Rates of this run
+        self.arrival_rate = Event.ARRIVAL_RATE if arrival_rate is None else arrival_rate
+        self.departure_rate = Event.DEPARTURE_RATE if departure_rate is None else departure_rate
+        self.variates = Variates.of(seed, Event.VARIATES)
+
         # Initialise Servers and EventHandler
         self.servers = Servers(server_number)
-        self.events = EventHandler()
+        self.events = EventHandler(retain)
 
         # Create and add initial event
-        starting_event = Event("arrival", 0)
-        starting_event.departure_time -= starting_event.arrival_time
-        starting_event.arrival_time = 0
+        starting_event = Event(Event.ARRIVAL, 0, self.arrival_rate, self.variates)
+        starting_event.begin(0)
         self.events.add(starting_event)
 
-        # Run simulation until number of events handled
         self.arrival_number = 0
+        self.execute(arrival_total, precision, batch_size, warmup, start, instrument, progress, progress_interval,
+                     checkpoint, checkpoint_interval, trace, sensitivity)
+
+    def execute(self, arrival_total: int, precision: float = None, batch_size: int = 1000,
+                warmup=None, start: str = "empty", instrument: bool = False, progress=None,
+                progress_interval: int = 10000, checkpoint: str = None, checkpoint_interval: int = 100000,
+                trace: str = None, sensitivity: bool = False):
+        """
+        Simulate a prepared run, either for a fixed number of arrivals or in batches until the
+        batch means confidence interval of the blocking probability is narrow enough
+        :param arrival_total: Number of events, or the cap on them with a precision
+        :param precision: Relative half width of blocking at which to stop
+        :param batch_size: Number of arrivals per batch
+        :param warmup: Arrivals discarded before statistics accumulate, or "mser" to choose by MSER
+        :param start: "empty" or "stationary" to start with busy servers drawn from the analytic distribution
+        :param instrument: Record hot-path measurements in self.stats
+        :param progress: Callable given self.stats every progress_interval events, implies instrument
+        :param progress_interval: Events between progress calls
+        :param checkpoint: File the run state is saved to every checkpoint_interval arrivals, or None
+        :param checkpoint_interval: Arrivals between checkpoints
+        :param trace: Binary file every admission, block and departure is recorded to, or None
+        :param sensitivity: Estimate the derivatives of the batch value with respect to each rate by likelihood
+        ratios, which needs exponential rates
+        """
+        self.arrival_total = arrival_total
+        self.precision = precision
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.wall_time = 0.0
+
+        begin = perf_counter()
+        self.simulation_time = 0
+        self.occupancy = Occupancy(self.servers.server_number)
+        self.warmup = warmup
+        self.start = start
+        if start == "stationary":
+            self.prefill()
+
+        # Tracing wraps the event list innermost, so checkpoints carry the trace writer with it
+        self.trace = trace
+        if trace is not None:
+            self.events = TracedEvents(self.events, TraceWriter(trace, self.servers.server_number, self.PATHS))
+
+        # Scores are accumulated from here, the draws of a stationary start are left out
+        self.sensitivity = sensitivity
+        if sensitivity:
+            rates = self.arrival_rates() + [self.departure_rate]
+            if any(isinstance(rate, Distribution) for rate in rates):
+                raise ValueError("Rate sensitivities need exponential rates")
+            if not all(rates):
+                raise ValueError("Rate sensitivities need positive rates")
+            self.events = ScoredEvents(self.events, self.arrival_rates(), self.departure_rate)
+
+        # Components are only wrapped when measuring, so uninstrumented runs pay nothing
+        self.stats = None
+        if instrument or progress is not None:
+            self.stats = RunStats(progress, progress_interval)
+            self.components = self.events, self.servers, self.variates
+            self.events = TimedEvents(self.events, self.stats)
+            self.servers = TimedServers(self.servers, self.stats)
+            self.variates = Timed(self.variates, "sampling", self.stats, ("exponential", "sample", "generator"))
+
+        # Fixed warm-up is simulated first and its counters become the origin of every metric
+        if warmup is not None and warmup != "mser":
+            self.simulate(min(warmup, arrival_total))
+        self.origin = self.snapshot()
+        self.warmup_arrivals = self.origin.arrivals
+
+        self.batches = BatchMeans(batch_size)
+        self.snapshots = None if precision is None and warmup != "mser" and not sensitivity else [self.origin]
+        # With MSER each batch keeps the occupancy it gained over the states it visited, the origin is rebuilt
+        # from them once the truncation is known
+        self.increments = [] if warmup == "mser" else None
+        self.boundary_occupancy = self.origin.occupancy
+        self.kept = None
+        self.next_search = 0
+        self.next_checkpoint = self.arrival_number + checkpoint_interval
+        self.wall_time = perf_counter() - begin
+
+        self.proceed()
+
+    def proceed(self):
+        """
+        Simulate the main phase of a run from its current state, saving checkpoints on the way
+        """
+        begin = perf_counter()
+        batch_size = self.batches.batch_size
+
+        while self.arrival_number < self.arrival_total:
+            target = self.arrival_total
+            if self.snapshots is not None:
+                target = min(target, self.snapshots[-1].arrivals + batch_size)
+            if self.checkpoint is not None:
+                target = min(target, self.next_checkpoint)
+            self.simulate(target)
+
+            # Close a batch at its boundary or at the arrival cap
+            if self.snapshots is not None and (self.arrival_number == self.snapshots[-1].arrivals + batch_size or
+                                               self.arrival_number == self.arrival_total):
+                self.snapshots.append(self.snapshot(False))
+                if self.increments is not None:
+                    self.increments.append(self.increment())
+                self.batches.add(self.batch_value(self.snapshots[-2].counts, self.snapshots[-1].counts))
+                if self.precision is not None and len(self.batches) >= MMCC.MIN_BATCHES and \
+                        self.stopping().precision() <= self.precision:
+                    break
+
+            if self.checkpoint is not None and self.arrival_number >= self.next_checkpoint:
+                self.next_checkpoint += self.checkpoint_interval
+                self.wall_time += perf_counter() - begin
+                begin = perf_counter()
+                self.save(self.checkpoint)
+
+        if self.snapshots is not None:
+            self.batches = self.truncated(self.snapshots)
+
+        self.wall_time += perf_counter() - begin
+        if self.stats is not None:
+            self.stats.elapsed = self.wall_time
+            self.events, self.servers, self.variates = self.components
+            del self.components
+        if self.sensitivity:
+            self.events = self.events.target
+            self.sensitivities = self.derivatives()
+        if self.trace is not None:
+            self.events.writer.record(self.simulation_time, TraceWriter.WARMUP, 0, 0, self.warmup_arrivals)
+            self.events.writer.close()
+            self.events = self.events.target
+
+    def save(self, path: str):
+        """
+        Write the complete run state, including event list, server pool, counters and random
+        generator states, so that resume continues the run exactly
+        :param path: Checkpoint file, replaced atomically
+        """
+        state = dict(self.__dict__)
+        if "components" in state:
+            state["events"], state["servers"], state["variates"] = state.pop("components")
+            state["stats"] = None
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump((type(self), state), f, pickle.HIGHEST_PROTOCOL)
+        replace(path + ".tmp", path)
+
+    def resume(path: str):
+        """
+        Continue a run from a checkpoint to its end, instrumentation is not restored
+        :param path: Checkpoint file written by save
+        :return: Simulation with the completed run
+        """
+        with open(path, "rb") as f:
+            model, state = pickle.load(f)
+        machine = model.__new__(model)
+        machine.__dict__.update(state)
+        machine.proceed()
+        return machine
+
+    def stopping(self) -> BatchMeans:
+        """
+        Batch means the stopping rule judges, called once per batch. With MSER warm-up the truncation is
+        only searched again once the batch count has grown by MSER_GROWTH and later batches are added to
+        the kept ones in between, so the checks take linear time over the run. The origin is left as it is
+        until the run ends
+        :return: Batch means of the batches currently kept
+        """
+        if self.warmup != "mser":
+            return self.batches
+        if self.kept is None or len(self.batches) >= self.next_search:
+            self.kept = BatchMeans(self.batches.batch_size)
+            for value in self.batches.values[self.batches.truncation():]:
+                self.kept.add(value)
+            self.next_search = int(len(self.batches) * MMCC.MSER_GROWTH) + 1
+        else:
+            self.kept.add(self.batches.values[-1])
+        return self.kept
+
+    def truncated(self, snapshots: list) -> BatchMeans:
+        """
+        With MSER warm-up, drop the batches the rule attributes to the warm-up and move the origin
+        of every metric to the end of them
+        :param snapshots: Snapshots at each batch boundary, starting with the run start
+        :return: Batch means of the batches kept
+        """
+        if self.warmup != "mser":
+            return self.batches
+        drop = self.batches.truncation()
+        occupancy = snapshots[0].occupancy.copy()
+        for low, gained in self.increments[:drop]:
+            occupancy[low:low + len(gained)] += gained
+        self.origin = snapshots[drop]._replace(occupancy=occupancy)
+        self.warmup_arrivals = self.origin.arrivals
+        kept = BatchMeans(self.batches.batch_size)
+        for value in self.batches.values[drop:]:
+            kept.add(value)
+        return kept
+
+    def prefill(self):
+        """
+        Start with busy servers drawn from the analytic stationary occupancy, each call holding its
+        server for a fresh holding time, the exact residual only when holding times are exponential
+        """
+        distribution = self.initial_occupancy()
+        busy = self.variates.generator("warmup").choice(len(distribution), p=distribution)
+        for _ in range(busy):
+            call = self.initial_call()
+            call.begin(0)
+            call.served_by(self.servers.allocate(), self.departure_rate, self.variates)
+            self.events.add(call)
+
+    def arrival_rates(self) -> list:
+        """
+        :return: Arrival rate of each path
+        """
+        return [self.arrival_rate]
+
+    def derivatives(self) -> dict:
+        """
+        Likelihood ratio estimates from the previous run, after any warm-up
+        :return: Derivative of the blocking probability with respect to each rate, by run parameter
+        """
+        first = len(self.snapshots) - 1 - len(self.batches)
+        scores = [snapshot.scores for snapshot in self.snapshots]
+        derivatives = Sensitivity.derivatives(self.batches.values, scores, first)
+        return dict(zip(self.RATES + ("departure_rate",), derivatives))
+
+    def initial_occupancy(self):
+        """
+        Analytic stationary distribution of busy servers. Under Poisson arrivals it depends on the holding
+        time distribution only through its mean, so a Distribution is taken at the rate of its mean
+        :return: Probability of each number of busy servers
+        """
+        return Analytic.occupancy(self.servers.server_number, 0, 0, Distribution.rate_of(self.arrival_rate),
+                                  Distribution.rate_of(self.departure_rate))
+
+    def initial_call(self) -> Event:
+        """
+        :return: Call placed in service before the run starts
+        """
+        return Event(Event.ARRIVAL, 0, self.arrival_rate, self.variates)
+
+    def snapshot(self, occupancy: bool = True) -> Snapshot:
+        """
+        :param occupancy: Copy the occupancy times, only needed for the origin
+        :return: Snapshot of the run
+        """
+        return Snapshot(self.batch_counts(), self.arrival_number,
+                        numpy.array(self.occupancy.times) if occupancy else None,
+                        list(self.events.scores) if self.sensitivity else None)
+
+    def increment(self) -> tuple:
+        """
+        Occupancy gained since the previous batch boundary, kept over the range of states visited so that
+        a batch holds memory for the states it reached rather than for every server
+        :return: Lowest state visited in the batch and the time gained in each state from it
+        """
+        times = numpy.array(self.occupancy.times)
+        gained = times - self.boundary_occupancy
+        self.boundary_occupancy = times
+        visited = numpy.flatnonzero(gained)
+        if not len(visited):
+            return 0, gained[:0].copy()
+        return int(visited[0]), gained[visited[0]:visited[-1] + 1].copy()
+
+    def simulate(self, arrival_total: int):
+        """
+        Handle events until the number of arrivals is reached
+        :param arrival_total: Number of events
+        """
+
+        ARRIVAL = Event.ARRIVAL
+        occupancy = self.occupancy.times
+        last = self.occupancy.last
 
         while(self.arrival_number < arrival_total):
 
-            # Iterate to next event and update simulation time
+            # Iterate to next event, credit the time since the last one to the busy servers and update simulation time
             current_event = self.events.next()
-            self.simulation_time = current_event.time()
+            occupancy[self.servers.busy_number] += current_event.key - last
+            last = self.simulation_time = current_event.key
 
             # If arrival, update counter and add to appropriate list
-            if current_event.event_type == "arrival":
+            if current_event.kind == ARRIVAL:
                 self.arrival_number += 1
-                self.events.add(Event("arrival", current_event.time()))
+                self.events.add(self.next_arrival(current_event))
 
-                # If no servers free, block event
-                if not self.servers.is_free():
+                # If not admitted, block event, still consuming its holding time under common random numbers
+                if not self.admit(current_event):
                     self.events.block(current_event)
+                    if self.variates.common:
+                        Event.draw(self.departure_rate, "departure", self.variates)
                     continue
 
                 # Assign server to event
-                current_event.served_by(self.servers.allocate())
+                current_event.served_by(self.servers.allocate(), self.departure_rate, self.variates)
                 self.events.add(current_event)
 
             # If departure, free server and depart
@@ -57,132 +377,108 @@ class MMCC:
                 self.servers.deallocate(current_event.served_by())
                 self.events.depart(current_event)
 
+        self.occupancy.last = last
+
+    def next_arrival(self, event: Event) -> Event:
+        """
+        Create the arrival following an arrival, reusing a finished event when one is available
+        :param event: Arrival being handled
+        :return: Next arrival
+        """
+        recycled = self.events.recycle()
+        if recycled is None:
+            return Event(Event.ARRIVAL, event.key, self.arrival_rate, self.variates)
+        recycled.renew(event.key, self.arrival_rate, self.variates)
+        return recycled
+
+    def admit(self, event: Event) -> bool:
+        """
+        Decide whether an arrival is given a server
+        :param event: Arrival being handled
+        :return: True if a server is free, else false
+        """
+        return self.servers.is_free()
+
+    def batch_counts(self) -> tuple:
+        """
+        :return: Counters that batch values are computed from
+        """
+        return self.arrival_number, self.events.blocked_number
+
+    def batch_value(self, previous: tuple, current: tuple) -> float:
+        """
+        Blocking probability within a batch
+        :param previous: Counters at start of batch
+        :param current: Counters at end of batch
+        :return: Blocked fraction of the batch arrivals
+        """
+        arrivals, blocked = current[0] - previous[0], current[1] - previous[1]
+        return blocked / arrivals if arrivals else 0
+
     def blocking_probability(self) -> float:
         """
-        Obtain blocking probability of previous run
+        Obtain blocking probability of previous run, after any warm-up
         :return: Blocking probability
         """
-        return len(self.events.blocked)/self.arrival_number
+        return self.batch_value(self.origin.counts, self.batch_counts())
 
     def server_utilisation(self) -> float:
         """
-        Obtain server utilisation of previous run
+        Obtain server utilisation of previous run, after any warm-up, as the time-averaged number of busy servers
         :return: Server utilisation
         """
-        return sum([e.service_time() for e in self.events.departed]) / self.simulation_time
+        return self.occupancy.mean(self.origin.occupancy)
 
+    def occupancy_distribution(self) -> list:
+        """
+        :return: Fraction of time with each number of servers busy in previous run, after any warm-up
+        """
+        return self.occupancy.distribution(self.origin.occupancy)
 
-if __name__ == "__main__":
+    def occupancy_blocking(self) -> float:
+        """
+        Blocking probability of previous run by PASTA, the fraction of time an arrival would be blocked
+        :return: Blocking probability
+        """
+        return self.occupancy.tail(self.servers.server_number, self.origin.occupancy)
 
-    def expected_blocking_probability(server_number: int, arrival_rate: float, departure_rate: float) -> float:
+    def occupancy_residuals(self) -> list:
         """
-        Calculate expected blocking probability via analytical methods
-        :param server_number: Number of servers
-        :param arrival_rate: Rate of arrival of events
-        :param departure_rate: Rate of departure of events
-        :return: Expected blocking probability
-        """
-
-        numerator = double(((arrival_rate / departure_rate)**server_number)/double(factorial(server_number)))
-        denominator = sum( [((arrival_rate/departure_rate)**k)/factorial(k) for k in range(1,server_number)])
-        return numerator / denominator
-
-    def expected_server_utilisation(arrival_rate: float, departure_rate: float) -> float:
-        """
-        Calculate expected server utilisation via analytical methods
-        :param arrival_rate: Rate of arrival of events
-        :param departure_rate: Rate of departure of events
-        :return: Expected server utilisation
-        """
-        return arrival_rate / departure_rate
-
-    matplotlib.pyplot.show()
-    machine = MMCC()
-
-    # Initialise test parameters
-    servers = 16
-    arrival_range = linspace(0.01, 0.1, 100)
-
-    departure_rate = 0.01
-    clients = 10000
-
-    # Lists to hold blocking rates
-    simulation_blocking = []
-    expected_blocking = []
-
-    # Lists to hold utilisation rates
-    simulation_utilisation = []
-    expected_utilisation = []
-
-    # Lists to hold outcomes
-    simulation_arrival = []
-    simulation_incomplete = []
-    simulation_departed = []
-    simulation_blocked = []
-
-    # Simulation runs
-    index = 0
-
-    for i, arrival_rate in enumerate(arrival_range):
-        Event.ARRIVAL_RATE = arrival_rate
-
-        machine.run(server_number=servers, arrival_total=clients)
-
-        probability = machine.blocking_probability()
-
-        if probability < 0.01: index = i
-
-        # Add simulation info to lists
-        simulation_blocking.append(probability)
-        expected_blocking.append(expected_blocking_probability(servers, arrival_rate, departure_rate))
-
-        simulation_utilisation.append(machine.server_utilisation())
-        expected_utilisation.append(expected_server_utilisation(arrival_rate, departure_rate))
-
-        simulation_arrival.append(machine.arrival_number)
-        simulation_incomplete.append(machine.arrival_number - (len(machine.events.departed) + len(machine.events.blocked)))
-        simulation_departed.append(len(machine.events.departed))
-        simulation_blocked.append(len(machine.events.blocked))
-
-    # Best simulation with under 0.01 blocking
-    print("Values for run on best arrival rate:")
-
-    print("\tEvents Handled :")
-    print("\t\tArrivals:", simulation_arrival[index])
-    print("\t\tIncomplete:", simulation_incomplete[index])
-    print("\t\tDepartures:", simulation_departed[index])
-    print("\t\tBlocked:", simulation_blocked[index])
-
-    print("\tBlocking rate:", simulation_blocking[index])
-    print("\tServer Utilisation:", simulation_utilisation[index])
-    print()
-
-    # Info about investigation progress
-    difference = [i - j for i, j in zip(simulation_blocking, expected_blocking)]
-    print("For blocking rate below 0.01")
-    print("\tArrival rate:", arrival_range[index])
-    print("\tBlocking probability:", simulation_blocking[index])
-    print("\tVariance from predictions:", sum(difference) / len(difference))
-
-    # Plot blocking probability findings
-    figure()
-    plot(arrival_range, simulation_blocking, "b.", label="Simulation blocking percentage")
-    plot(arrival_range, expected_blocking, "r--", label="Theoretical blocking percentage")
-    plot([0.01, arrival_range[index]], [simulation_blocking[index]]*2, "g--", label="Best with probability under 0.01")
-    plot([arrival_range[index]]*2, [-0.0005, simulation_blocking[index]], "g--")
-    legend()
-    ylabel("Blocking Probability")
-    xlabel("Arrival Rate")
-    xlim(0.01, 0.1)
-    ylim(-0.0005,0.025)
-    show(block=True)
-
-    # Plot server utilisation findings
-    figure()
-    plot(arrival_range, simulation_utilisation, "b.", label="Server utilisation")
-    plot(arrival_range, expected_utilisation, "r--", label="Predicted server utilisation")
-    ylabel("Server Utilisation")
-    xlabel("Arrival Rate")
-    legend()
-    xlim(0.01, 0.1)
-    show(block=True)
+        :return: Measured minus analytic probability of each number of servers busy
+        """
+        return [p - q for p, q in zip(self.occupancy_distribution(), self.initial_occupancy())]
+
+    def control(self) -> tuple:
+        """
+        Control variate of previous run, the time-averaged number of busy servers, whose expectation
+        is known analytically, for M/M/C/C the carried load a(1 - B) with B the Erlang-B value
+        :return: Observed value and its expectation
+        """
+        expectation = sum(k * p for k, p in enumerate(self.initial_occupancy()))
+        return self.server_utilisation(), expectation
+
+    def summary(self) -> dict:
+        """
+        Obtain counters and metrics of previous run
+        :return: Dictionary of run outcomes, with the derivative estimates prefixed by sensitivity_
+        """
+        summary = {"arrivals": self.arrival_number,
+                   "departed": len(self.events.departures),
+                   "blocked": self.events.blocked_number,
+                   "incomplete": self.servers.busy_count(),
+                   "simulation_time": self.simulation_time,
+                   "blocking_probability": self.blocking_probability(),
+                   "server_utilisation": self.server_utilisation(),
+                   "events": self.arrival_number + len(self.events.departures),
+                   "wall_time": self.wall_time,
+                   "precision": self.batches.precision() if len(self.batches) > 1 else float("nan"),
+                   "warmup_arrivals": self.warmup_arrivals}
+        if self.sensitivity:
+            for name, derivative in self.sensitivities.items():
+                summary["sensitivity_" + name] = derivative
+        return summary
+
+
+if __name__ == "__main__":
+    from Experiments import Experiments
+    Experiments.main(["mmcc", "--plot", "--seed", "0", "--cache", ".cache"])
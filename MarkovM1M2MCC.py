@@ -0,0 +1,56 @@
+from EventVariant import EventVariant
+from MarkovMMCC import MarkovMMCC
+from Variates import Variates
+
+
+class MarkovM1M2MCC(MarkovMMCC):
+    """
+    Class to simulate M1/M2/M/C/C system as a birth-death chain on the number of busy servers
+    """
+
+    def run(self, total_servers: int, arrival_total: int, threshold: int, *, handover_rate: float = None,
+            newcall_rate: float = None, departure_rate: float = None, seed=None):
+        """
+        Run simulation with threshold value
+        :param total_servers: Number of servers
+        :param arrival_total: Number of events
+        :param threshold: Servers reserved for handover calls
+        :param handover_rate: Arrival rate of handovers, class priority if None
+        :param newcall_rate: Arrival rate of new calls, class priority if None
+        :param departure_rate: Departure rate of events, EventVariant.DEPARTURE_RATE if None
+        :param seed: Integer seed, SeedSequence or Variates of the run, shared class source if None
+        """
+        self.departure_rate = EventVariant.DEPARTURE_RATE if departure_rate is None else departure_rate
+        self.variates = Variates.of(seed, EventVariant.VARIATES)
+        self.server_number = total_servers
+
+        # New calls may only use the servers not reserved for handovers
+        self.paths = [("handover", EventVariant.PRIORITIES["handover"] if handover_rate is None else handover_rate,
+                       total_servers),
+                      ("newcall", EventVariant.PRIORITIES["newcall"] if newcall_rate is None else newcall_rate,
+                       total_servers - threshold)]
+
+        self.simulate(arrival_total)
+
+    def blocking_probability(self) -> float:
+        """
+        Obtain aggregated blocking probability of previous run
+        :return: Blocking probability
+        """
+
+        HFP = self.blocked[0] / self.arrivals[0] if self.arrivals[0] else 0
+        CBP = self.blocked[1] / self.arrivals[1] if self.arrivals[1] else 0
+
+        return CBP + (10 * HFP)
+
+    def summary(self) -> dict:
+        """
+        Obtain counters and metrics of previous run
+        :return: Dictionary of run outcomes
+        """
+        summary = super().summary()
+        summary.update({"arrivals_handover": self.arrivals[0],
+                        "arrivals_newcall": self.arrivals[1],
+                        "blocked_handover": self.blocked[0],
+                        "blocked_newcall": self.blocked[1]})
+        return summary
@@ -0,0 +1,130 @@
+from Analytic import Analytic
+from Event import Event
+from Variates import Variates
+
+
+class MarkovMMCC:
+    """
+    Class to simulate M/M/C/C system as a birth-death chain on the number of busy servers
+    """
+
+    def run(self, server_number: int, arrival_total: int, *, arrival_rate: float = None,
+            departure_rate: float = None, seed=None):
+        """
+        Run simulation with specified parameters
+        :param server_number: Number of servers
+        :param arrival_total: Number of events
+        :param arrival_rate: Arrival rate of events, Event.ARRIVAL_RATE if None
+        :param departure_rate: Departure rate of events, Event.DEPARTURE_RATE if None
+        :param seed: Integer seed, SeedSequence or Variates of the run, shared class source if None
+        """
+        self.departure_rate = Event.DEPARTURE_RATE if departure_rate is None else departure_rate
+        self.variates = Variates.of(seed, Event.VARIATES)
+        self.server_number = server_number
+
+        # Arrival streams as (name, rate, busy servers below which the arrival is admitted)
+        self.paths = [("arrival", Event.ARRIVAL_RATE if arrival_rate is None else arrival_rate, server_number)]
+
+        self.simulate(arrival_total)
+
+    def simulate(self, arrival_total: int):
+        """
+        Step the chain until the number of arrivals is reached. Each state is held for its
+        expected sojourn time rather than a sampled one, which leaves time-weighted averages
+        unbiased and only needs one uniform draw per transition
+        :param arrival_total: Number of events
+        """
+        server_number = self.server_number
+        departure_rate = self.departure_rate
+        arrival_rate = sum(rate for _, rate, _ in self.paths)
+
+        # Cumulative share of the total arrival rate for picking the arriving path
+        shares, cumulative = [], 0
+        for _, rate, _ in self.paths:
+            cumulative += rate
+            shares.append(cumulative)
+        limits = [limit for _, _, limit in self.paths]
+
+        # Transition rate and expected sojourn time of each state
+        rates = [arrival_rate + k * departure_rate for k in range(server_number + 1)]
+        sojourns = [1 / rate for rate in rates]
+
+        occupancy = [0.0] * (server_number + 1)
+        arrivals = [0] * len(self.paths)
+        blocked = [0] * len(self.paths)
+        departures = 0
+        arrival_number = 0
+        k = 0
+
+        while arrival_number < arrival_total:
+            for u in self.variates.block("transition"):
+                occupancy[k] += sojourns[k]
+                u *= rates[k]
+
+                # Departure of one of the k calls in service
+                if u >= arrival_rate:
+                    k -= 1
+                    departures += 1
+                    continue
+
+                path = 0
+                while u >= shares[path]:
+                    path += 1
+                arrivals[path] += 1
+                arrival_number += 1
+
+                if k < limits[path]:
+                    k += 1
+                else:
+                    blocked[path] += 1
+
+                if arrival_number == arrival_total:
+                    break
+
+        self.occupancy = occupancy
+        self.arrivals = arrivals
+        self.blocked = blocked
+        self.departures = departures
+        self.arrival_number = arrival_number
+        self.busy_number = k
+        self.simulation_time = sum(occupancy)
+
+    def blocking_probability(self) -> float:
+        """
+        Obtain blocking probability of previous run
+        :return: Blocking probability
+        """
+        return sum(self.blocked) / self.arrival_number
+
+    def server_utilisation(self) -> float:
+        """
+        Obtain server utilisation of previous run, as the time-averaged number of busy servers
+        :return: Server utilisation
+        """
+        return sum(k * t for k, t in enumerate(self.occupancy)) / self.simulation_time
+
+    def control(self) -> tuple:
+        """
+        Control variate of previous run, the time-averaged number of busy servers, whose expectation
+        is known analytically, for M/M/C/C the carried load a(1 - B) with B the Erlang-B value
+        :return: Observed value and its expectation
+        """
+        # The last path is limited by the threshold, any other is a handover path using every server
+        _, newcall_rate, limit = self.paths[-1]
+        handover_rate = self.paths[0][1] if len(self.paths) > 1 else 0
+        distribution = Analytic.occupancy(self.server_number, self.server_number - limit, handover_rate,
+                                          newcall_rate, self.departure_rate)
+        return self.server_utilisation(), sum(k * p for k, p in enumerate(distribution))
+
+    def summary(self) -> dict:
+        """
+        Obtain counters and metrics of previous run
+        :return: Dictionary of run outcomes
+        """
+        return {"arrivals": self.arrival_number,
+                "departed": self.departures,
+                "blocked": sum(self.blocked),
+                "incomplete": self.busy_number,
+                "simulation_time": self.simulation_time,
+                "blocking_probability": self.blocking_probability(),
+                "server_utilisation": self.server_utilisation()}
@@ -0,0 +1,350 @@
+from heapq import heappop, heappush
+from multiprocessing import Pipe, Process
+from time import perf_counter
+
+import numpy
+from numpy.random import SeedSequence
+
+from Event import Event
+from EventVariant import EventVariant
+from Servers import Servers
+from Statistics import Occupancy
+from Sweep import Sweep
+from Variates import Variates
+
+
+class Cell:
+    """
+    One cell of a network, a pool of servers with channels reserved for handovers
+    """
+
+    def __init__(self, index: int, neighbours: list, total_servers: int, threshold: int, seed: SeedSequence):
+        """
+        Initialisation
+        :param index: Cell index, row-major in the grid
+        :param neighbours: Indices of the cells calls may move to
+        :param total_servers: Number of servers
+        :param threshold: Servers reserved for handover calls
+        :param seed: SeedSequence of the cell, so its draws do not depend on how cells are partitioned
+        """
+        self.index = index
+        self.neighbours = neighbours
+        self.servers = Servers(total_servers)
+        self.shared_servers = total_servers - threshold
+        self.variates = Variates(seed)
+        self.uniforms = []
+        self.sequence = 0
+        self.reset(0.0)
+
+    def reset(self, time: float):
+        """
+        Discard statistics gathered before a time, ending the warm-up
+        :param time: Current simulation time
+        """
+        self.arrivals = [0, 0]
+        self.blocked = [0, 0]
+        self.handovers = 0
+        self.occupancy = Occupancy(self.servers.server_number)
+        self.occupancy.last = time
+
+    def uniform(self) -> float:
+        """
+        :return: Uniform variate from the mobility stream of the cell
+        """
+        if not self.uniforms:
+            self.uniforms = self.variates.block("mobility")
+        return self.uniforms.pop()
+
+    def next(self) -> int:
+        """
+        :return: Sequence number for the next event the cell schedules, breaking ties between equal times
+        """
+        self.sequence += 1
+        return self.sequence
+
+    def summary(self, columns: int) -> dict:
+        """
+        Obtain counters and metrics of the cell
+        :param columns: Columns of the grid
+        :return: Dictionary of cell outcomes
+        """
+        handover, newcall = self.arrivals[EventVariant.HANDOVER], self.arrivals[EventVariant.NEWCALL]
+        HFP = self.blocked[EventVariant.HANDOVER] / handover if handover else 0
+        CBP = self.blocked[EventVariant.NEWCALL] / newcall if newcall else 0
+        return {"cell": self.index,
+                "row": self.index // columns,
+                "column": self.index % columns,
+                "arrivals_handover": handover,
+                "arrivals_newcall": newcall,
+                "blocked_handover": self.blocked[EventVariant.HANDOVER],
+                "blocked_newcall": self.blocked[EventVariant.NEWCALL],
+                "handovers_out": self.handovers,
+                "handover_failure": HFP,
+                "newcall_blocking": CBP,
+                "blocking_probability": CBP + (10 * HFP),
+                "server_utilisation": self.occupancy.mean()}
+
+
+class Shard:
+    """
+    Group of cells simulated together by one process, one window of simulation time at a time
+    """
+
+    def __init__(self, cells: list, newcall_rate: float, departure_rate: float, mobility_rate: float,
+                 delay: float, columns: int):
+        """
+        Initialisation
+        :param cells: Cells of the shard
+        :param newcall_rate: Arrival rate of new calls in each cell
+        :param departure_rate: Rate at which calls end
+        :param mobility_rate: Rate at which calls leave their cell for a neighbour
+        :param delay: Time a handover takes to reach its new cell
+        :param columns: Columns of the grid
+        """
+        self.cells = {cell.index: cell for cell in cells}
+        self.newcall_rate = newcall_rate
+        self.departure_rate = departure_rate
+        self.leave_rate = departure_rate + mobility_rate
+        self.handover_share = mobility_rate / self.leave_rate
+        self.delay = delay
+        self.columns = columns
+        self.time = 0.0
+        self.events = 0
+
+        # Entries are (time, cell, origin cell, sequence, kind, path, server, destination)
+        self.upcoming = []
+        for cell in cells:
+            self.arrival(cell, 0.0)
+
+    def arrival(self, cell: Cell, time: float):
+        """
+        Schedule the next new call of a cell
+        :param cell: Cell the call arrives at
+        :param time: Current simulation time
+        """
+        time += cell.variates.exponential("newcall", self.newcall_rate)
+        heappush(self.upcoming, (time, cell.index, cell.index, cell.next(), Event.ARRIVAL,
+                                 EventVariant.NEWCALL, 0, -1))
+
+    def advance(self, until: float, incoming: list, reset: bool = False) -> list:
+        """
+        Simulate every event before the end of a window
+        :param until: End of the window
+        :param incoming: Handovers arriving at cells of the shard, as (time, cell, origin cell, sequence)
+        :param reset: End the warm-up at the start of the window
+        :return: Handovers leaving cells of the shard, all arriving after the window
+        """
+        if reset:
+            for cell in self.cells.values():
+                cell.reset(self.time)
+        for time, index, origin, sequence in incoming:
+            heappush(self.upcoming, (time, index, origin, sequence, Event.ARRIVAL, EventVariant.HANDOVER, 0, -1))
+
+        outgoing = []
+        upcoming = self.upcoming
+        while upcoming and upcoming[0][0] < until:
+            time, index, _, _, kind, path, server, destination = heappop(upcoming)
+            cell = self.cells[index]
+            cell.occupancy.add(time, cell.servers.busy_number)
+            self.events += 1
+
+            # Departure or move to a neighbour, which arrives there after the delay
+            if kind == Event.DEPARTURE:
+                cell.servers.deallocate(server)
+                if destination >= 0:
+                    cell.handovers += 1
+                    outgoing.append((time + self.delay, destination, index, cell.next()))
+                continue
+
+            if path == EventVariant.NEWCALL:
+                self.arrival(cell, time)
+            cell.arrivals[path] += 1
+            if not (cell.servers.busy_number < cell.shared_servers or
+                    (path == EventVariant.HANDOVER and cell.servers.is_free())):
+                cell.blocked[path] += 1
+                continue
+
+            # The call stays until it ends or moves, whichever comes first, a cell without neighbours
+            # keeping its calls until they end
+            destination = -1
+            if cell.neighbours:
+                leave = time + cell.variates.exponential("stay", self.leave_rate)
+                if cell.uniform() < self.handover_share:
+                    destination = cell.neighbours[int(cell.uniform() * len(cell.neighbours))]
+            else:
+                leave = time + cell.variates.exponential("stay", self.departure_rate)
+            heappush(upcoming, (leave, index, index, cell.next(), Event.DEPARTURE, path,
+                                cell.servers.allocate(), destination))
+
+        self.time = until
+        return outgoing
+
+    def summaries(self) -> list:
+        """
+        Close the occupancy of every cell at the current time
+        :return: Summary of each cell
+        """
+        for cell in self.cells.values():
+            cell.occupancy.add(self.time, cell.servers.busy_number)
+        return [cell.summary(self.columns) for cell in self.cells.values()]
+
+
+def _serve_shard(connection, shard: Shard):
+    """
+    Worker process loop, advancing a shard window by window as the coordinator asks
+    :param connection: Pipe end to the coordinator
+    :param shard: Shard simulated by this process
+    """
+    while True:
+        command, arguments = connection.recv()
+        if command == "advance":
+            connection.send(shard.advance(*arguments))
+        else:
+            connection.send((shard.summaries(), shard.events))
+            connection.close()
+            return
+
+
+class Network:
+    """
+    Class to simulate a grid of M1/M2/M/C/C cells whose handovers are calls moving between neighbours,
+    optionally with the cells partitioned across processes
+    """
+
+    def run(self, rows: int, columns: int, total_servers: int, threshold: int, duration: float,
+            newcall_rate: float = None, departure_rate: float = None, mobility_rate: float = 0.005,
+            warmup: float = 0.0, delay: float = 1.0, window: float = None, wrap: bool = True,
+            workers: int = 1, seed=None):
+        """
+        Run simulation with specified parameters. Shards advance in lockstep windows no longer than the
+        handover delay, so every handover sent during a window arrives after it and shards only exchange
+        handovers between windows. Each cell draws from its own streams, so results do not depend on the
+        number of workers. Every window costs a round trip of messages to each worker, so more than one
+        process only helps when each shard handles thousands of events per window, roughly when
+        2 * newcall_rate * (departure_rate + mobility_rate) / departure_rate * cells * window / workers
+        exceeds 1000. At the default rates and delay even grids of hundreds of cells fall well short, and
+        run fastest in one process
+        :param rows: Rows of the grid
+        :param columns: Columns of the grid
+        :param total_servers: Number of servers in each cell
+        :param threshold: Servers reserved for handover calls in each cell
+        :param duration: Simulation time measured after the warm-up
+        :param newcall_rate: Arrival rate of new calls in each cell, class priority if None
+        :param departure_rate: Rate at which calls end, EventVariant.DEPARTURE_RATE if None
+        :param mobility_rate: Rate at which a call moves to a neighbouring cell
+        :param warmup: Simulation time discarded before statistics accumulate
+        :param delay: Time a handover takes to reach its new cell, the lookahead of the synchronisation
+        :param window: Length of the synchronisation windows, the delay if None
+        :param wrap: Join opposite edges of the grid so every cell has four neighbours
+        :param workers: Number of processes the cells are partitioned across, in this process if 1
+        :param seed: Integer seed or SeedSequence of the run, random if None
+        """
+        window = delay if window is None else window
+        if not 0 < window <= delay:
+            raise ValueError("Window must be positive and no longer than the handover delay")
+        self.rows, self.columns = rows, columns
+        newcall_rate = EventVariant.PRIORITIES["newcall"] if newcall_rate is None else newcall_rate
+        departure_rate = EventVariant.DEPARTURE_RATE if departure_rate is None else departure_rate
+
+        sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        cells = [Cell(index, self.neighbours(index, wrap), total_servers, threshold, cell_sequence)
+                 for index, cell_sequence in enumerate(sequence.spawn(rows * columns))]
+
+        # Contiguous blocks of rows keep most neighbours on the same shard
+        workers = min(workers, len(cells))
+        shards = [Shard([cells[i] for i in block], newcall_rate, departure_rate, mobility_rate, delay, columns)
+                  for block in numpy.array_split(numpy.arange(len(cells)), workers)]
+        owner = {index: number for number, shard in enumerate(shards) for index in shard.cells}
+
+        begin = perf_counter()
+        boundaries = numpy.unique(numpy.concatenate((numpy.arange(window, warmup + duration, window),
+                                                     [warmup, warmup + duration])))
+        boundaries = boundaries[boundaries > 0].tolist()
+
+        connections = []
+        if workers > 1:
+            for shard in shards:
+                parent, child = Pipe()
+                process = Process(target=_serve_shard, args=(child, shard), daemon=True)
+                process.start()
+                connections.append((parent, process))
+
+        inboxes = [[] for _ in shards]
+        previous = 0.0
+        for until in boundaries:
+            arguments = [(until, sorted(inbox), previous == warmup and warmup > 0) for inbox in inboxes]
+            if connections:
+                for (connection, _), argument in zip(connections, arguments):
+                    connection.send(("advance", argument))
+                results = [connection.recv() for connection, _ in connections]
+            else:
+                results = [shard.advance(*argument) for shard, argument in zip(shards, arguments)]
+
+            inboxes = [[] for _ in shards]
+            for outgoing in results:
+                for handover in outgoing:
+                    inboxes[owner[handover[1]]].append(handover)
+            previous = until
+
+        if connections:
+            for connection, _ in connections:
+                connection.send(("finish", None))
+            results = [connection.recv() for connection, _ in connections]
+            for connection, process in connections:
+                process.join()
+        else:
+            results = [(shard.summaries(), shard.events) for shard in shards]
+
+        self.cell_summaries = sorted((summary for summaries, _ in results for summary in summaries),
+                                     key=lambda summary: summary["cell"])
+        self.events = sum(events for _, events in results)
+        self.shards = len(shards)
+        self.windows = len(boundaries)
+        self.simulation_time = duration
+        self.wall_time = perf_counter() - begin
+
+    def neighbours(self, index: int, wrap: bool) -> list:
+        """
+        :param index: Cell index, row-major in the grid
+        :param wrap: Join opposite edges of the grid
+        :return: Indices of the cells adjacent to a cell
+        """
+        row, column = divmod(index, self.columns)
+        neighbours = []
+        for r, c in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)):
+            if wrap:
+                r, c = r % self.rows, c % self.columns
+            elif not (0 <= r < self.rows and 0 <= c < self.columns):
+                continue
+            if (r, c) != (row, column) and r * self.columns + c not in neighbours:
+                neighbours.append(r * self.columns + c)
+        return neighbours
+
+    def cells(self) -> numpy.ndarray:
+        """
+        :return: Structured array of the counters and metrics of each cell of previous run
+        """
+        return Sweep.table([{} for _ in self.cell_summaries], self.cell_summaries)
+
+    def summary(self) -> dict:
+        """
+        Obtain network-wide counters and metrics of previous run
+        :return: Dictionary of run outcomes
+        """
+        totals = {name: sum(summary[name] for summary in self.cell_summaries)
+                  for name in ("arrivals_handover", "arrivals_newcall", "blocked_handover", "blocked_newcall",
+                               "handovers_out")}
+        HFP = totals["blocked_handover"] / totals["arrivals_handover"] if totals["arrivals_handover"] else 0
+        CBP = totals["blocked_newcall"] / totals["arrivals_newcall"] if totals["arrivals_newcall"] else 0
+        totals.update({"handover_failure": HFP,
+                       "newcall_blocking": CBP,
+                       "blocking_probability": CBP + (10 * HFP),
+                       "server_utilisation": sum(summary["server_utilisation"] for summary in self.cell_summaries)
+                       / len(self.cell_summaries),
+                       "cells": len(self.cell_summaries),
+                       "shards": self.shards,
+                       "windows": self.windows,
+                       "events": self.events,
+                       "simulation_time": self.simulation_time,
+                       "wall_time": self.wall_time})
+        return totals
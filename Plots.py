@@ -0,0 +1,106 @@
+from os import makedirs
+from os.path import join
+
+import matplotlib
+
+from Experiments import Experiments
+
+
+class Plots:
+    """
+    Figures of the experiment results, kept apart so the simulation never imports matplotlib
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        Initialisation
+        :param directory: Directory figures are saved to without being shown, or None to show them
+        """
+        self.directory = directory
+        if directory is not None:
+            matplotlib.use("Agg")
+            makedirs(directory, exist_ok=True)
+        from matplotlib import pyplot
+        self.pyplot = pyplot
+
+    def finish(self, name: str):
+        """
+        Show the current figure or save it
+        :param name: File name of the figure
+        """
+        if self.directory is None:
+            self.pyplot.show(block=True)
+        else:
+            self.pyplot.savefig(join(self.directory, name + ".png"))
+        self.pyplot.close()
+
+    def arrival_range(self, columns: dict):
+        """
+        Blocking probability and utilisation over arrival rates
+        :param columns: Columns of the arrival_range experiment
+        """
+        plt = self.pyplot
+        arrival_range, blocking = columns["arrival_rate"], columns["blocking_probability"]
+        index = Experiments.best(blocking, 0.01)
+
+        plt.figure()
+        plt.plot(arrival_range, blocking, "b.", label="Simulation blocking percentage")
+        plt.plot(arrival_range, columns["expected_blocking"], "r--", label="Theoretical blocking percentage")
+        plt.plot([0.01, arrival_range[index]], [blocking[index]]*2, "g--", label="Best with probability under 0.01")
+        plt.plot([arrival_range[index]]*2, [-0.0005, blocking[index]], "g--")
+        plt.legend()
+        plt.ylabel("Blocking Probability")
+        plt.xlabel("Arrival Rate")
+        plt.xlim(0.01, 0.1)
+        plt.ylim(-0.0005, 0.025)
+        self.finish("arrival_range_blocking")
+
+        plt.figure()
+        plt.plot(arrival_range, columns["server_utilisation"], "b.", label="Server utilisation")
+        plt.plot(arrival_range, columns["expected_utilisation"], "r--", label="Predicted server utilisation")
+        plt.ylabel("Server Utilisation")
+        plt.xlabel("Arrival Rate")
+        plt.legend()
+        plt.xlim(0.01, 0.1)
+        self.finish("arrival_range_utilisation")
+
+    def handover_range(self, columns: dict):
+        """
+        Aggregated blocking probability over handover rates
+        :param columns: Columns of the handover_range experiment
+        """
+        plt = self.pyplot
+        handover_range = columns["handover_rate"]
+
+        plt.figure()
+        plt.plot(handover_range, columns["blocking_probability"], "b.", label="ABP blocking probability")
+        plt.plot(handover_range, columns["expected_blocking"], "r--", label="Theoretical blocking percentage")
+        plt.plot([handover_range[0], handover_range[-1]], [0.02]*2, "g--", label="Target probability of 0.02")
+        plt.ylabel("ABP blocking probability")
+        plt.xlabel("Handover arrival rate")
+        plt.legend()
+        plt.xlim(handover_range[0], handover_range[-1])
+        plt.ylim(-0.005, 0.2)
+        plt.xscale("log")
+        self.finish("handover_range")
+
+    def call_range(self, columns: dict):
+        """
+        Aggregated blocking probability over new call rates
+        :param columns: Columns of the call_range experiment
+        """
+        plt = self.pyplot
+        call_range, blocking = columns["newcall_rate"], columns["blocking_probability"]
+        index = Experiments.best(blocking, 0.02)
+
+        plt.figure()
+        plt.plot(call_range, blocking, "b.", label="ABP blocking probability")
+        plt.plot(call_range, columns["expected_blocking"], "r--", label="Theoretical blocking percentage")
+        plt.plot([0.01, call_range[index]], [blocking[index]]*2, "g--", label="Setup with probability under 0.02")
+        plt.plot([call_range[index]]*2, [-0.005, blocking[index]], "g--")
+        plt.ylabel("ABP blocking probability")
+        plt.xlabel("New call arrival rate")
+        plt.xlim(0.01, 0.1)
+        plt.ylim(-0.005, 0.2)
+        plt.legend()
+        self.finish("call_range")
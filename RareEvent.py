@@ -0,0 +1,214 @@
+from math import sqrt
+from statistics import NormalDist
+
+import numpy
+
+from EventVariant import EventVariant
+from Variates import Variates
+
+
+class RareEvent:
+    """
+    Estimates handover failure and aggregated blocking of the M1/M2/M/C/C system when calls are too
+    rarely blocked for crude simulation, by importance sampling of regenerative cycles
+    """
+
+    def run(self, total_servers: int, cycles: int, threshold: int, handover_rate: float = None,
+            newcall_rate: float = None, departure_rate: float = None, seed=None, crude_cycles: int = None,
+            confidence: float = 0.95):
+        """
+        Run the estimator. The busy servers form a birth-death chain that regenerates each time it
+        returns to the state it started in. By PASTA the HFP is the long-run fraction of time with
+        every server busy, the expected time at C per cycle over the expected cycle length, and the
+        new call blocking the same with at least C - threshold busy. Each numerator is estimated from
+        cycles run under the chain conditioned to reach its level before returning to the start, each
+        weighted by its likelihood ratio so the estimate stays unbiased, and followed by the original
+        chain once the level is reached. Cycle lengths are not rare and come from crude cycles. Each
+        state is credited its expected sojourn time, as in the Markov engines
+        :param total_servers: Number of servers
+        :param cycles: Number of importance sampled cycles for each of the HFP and new call blocking
+        :param threshold: Servers reserved for handover calls
+        :param handover_rate: Arrival rate of handovers, class priority if None
+        :param newcall_rate: Arrival rate of new calls, class priority if None
+        :param departure_rate: Departure rate of events, EventVariant.DEPARTURE_RATE if None
+        :param seed: Integer seed, SeedSequence or Variates of the run, shared class source if None
+        :param crude_cycles: Number of crude cycles for the cycle length, cycles if None
+        :param confidence: Confidence level of the intervals
+        """
+        self.handover_rate = EventVariant.PRIORITIES["handover"] if handover_rate is None else handover_rate
+        self.newcall_rate = EventVariant.PRIORITIES["newcall"] if newcall_rate is None else newcall_rate
+        self.departure_rate = EventVariant.DEPARTURE_RATE if departure_rate is None else departure_rate
+        self.variates = Variates.of(seed, EventVariant.VARIATES)
+        self.server_number = total_servers
+        self.shared_servers = total_servers - threshold
+        self.confidence = confidence
+
+        # Birth and death rates, up probability and expected sojourn time of each state, blocked
+        # arrivals leave the state unchanged
+        self.births = [(self.handover_rate + self.newcall_rate if k < self.shared_servers else self.handover_rate)
+                       if k < total_servers else 0.0 for k in range(total_servers + 1)]
+        self.deaths = [k * self.departure_rate for k in range(total_servers + 1)]
+        rates = [birth + death for birth, death in zip(self.births, self.deaths)]
+        self.up = [birth / rate for birth, rate in zip(self.births, rates)]
+        self.sojourns = [1 / rate for rate in rates]
+
+        # Cycles start at the mode of the unrestricted load, kept below the threshold so they stay short
+        self.regeneration = max(0, min(int((self.handover_rate + self.newcall_rate) / self.departure_rate),
+                                       self.shared_servers - 1, total_servers - 1))
+
+        self.uniforms = {}
+        self.events = 0
+        top = self.cycles(cycles, total_servers, "failure")
+        above = self.cycles(cycles, self.shared_servers, "blocking")
+        crude = self.cycles(cycles if crude_cycles is None else crude_cycles, None, "cycle")
+
+        # Per cycle time at C and with new calls blocked, weighted by likelihood ratio, and cycle lengths
+        self.top = numpy.array([weight * time for _, time, _, weight in top])
+        self.above = numpy.array([weight * time for _, _, time, weight in above])
+        self.lengths = numpy.array([length for length, _, _, _ in crude])
+
+    def cycles(self, number: int, level, stream: str) -> list:
+        """
+        Simulate cycles conditioned to reach a level
+        :param number: Number of cycles
+        :param level: Number of busy servers the cycles are conditioned to reach, or None for the original chain
+        :param stream: Name of the uniform stream
+        :return: List of cycle outcomes
+        """
+        reached = level is None or self.regeneration >= level
+        # A level past a state no arrival can leave upwards, C without handovers when servers are reserved,
+        # is never reached, so every cycle spends no time there
+        if not reached and not all(self.births[self.regeneration:level]):
+            return [(0.0, 0.0, 0.0, 0.0)] * number
+        probabilities = self.up if reached else self.tilted(level)
+        return [self.cycle(probabilities, level, reached, stream) for _ in range(number)]
+
+    def tilted(self, level: int) -> list:
+        """
+        Up probabilities of the chain conditioned to reach a level before returning to the start.
+        The chance h(k) of doing so from k follows from the gambler's ruin ratios of death to birth
+        rates, and the conditioned chain moves up from k with probability p(k) h(k+1) / h(k)
+        :param level: Number of busy servers to reach
+        :return: Up probability of each state, those from the start up to the level conditioned
+        """
+        start = self.regeneration
+        # Sums of products of death over birth rates, accumulated in log space so they cannot overflow
+        ratios = numpy.log([self.deaths[j] / self.births[j] for j in range(start + 1, level)])
+        sums = numpy.logaddexp.accumulate(numpy.concatenate(([0.0], numpy.cumsum(ratios))))
+        # h(start) is 0 as the cycle ends on returning to it, h(level) is 1
+        h = numpy.concatenate(([0.0], numpy.exp(sums - sums[-1])))
+
+        probabilities = list(self.up)
+        for k in range(start, level):
+            up = self.up[k] * h[k + 1 - start]
+            down = (1 - self.up[k]) * (h[k - 1 - start] if k > start else 0.0)
+            probabilities[k] = up / (up + down)
+        return probabilities
+
+    def cycle(self, probabilities: list, level, reached: bool, stream: str) -> tuple:
+        """
+        Simulate one cycle of the chain from the regeneration state until it returns to it
+        :param probabilities: Up probability of each state until the level is reached
+        :param level: Number of busy servers after which the original chain is followed, or None
+        :param reached: Follow the original chain from the start
+        :param stream: Name of the uniform stream
+        :return: Cycle length, time at C, time with new calls blocked and likelihood ratio of the cycle
+        """
+        up, sojourns = self.up, self.sojourns
+        top_state, shared = self.server_number, self.shared_servers
+        uniforms = self.uniforms.setdefault(stream, [])
+        start = k = self.regeneration
+        weight = 1.0
+        length = top = above = 0.0
+
+        while True:
+            length += sojourns[k]
+            if k >= shared:
+                above += sojourns[k]
+                if k == top_state:
+                    top += sojourns[k]
+
+            if not uniforms:
+                uniforms.extend(self.variates.block(stream))
+            u = uniforms.pop()
+            self.events += 1
+
+            # Once the level is reached the rest of the cycle follows the original chain
+            p = up[k] if reached else probabilities[k]
+            if u < p:
+                if not reached:
+                    weight *= up[k] / p
+                k += 1
+            else:
+                if not reached:
+                    weight *= (1 - up[k]) / (1 - p)
+                k -= 1
+            reached = reached or k == level
+
+            if k == start:
+                return length, top, above, weight
+
+    def ratio(self, numerators: list) -> tuple:
+        """
+        Ratio of a sum of per-cycle means to the mean cycle length, with the half width of its confidence
+        interval by the delta method, each sample being independent
+        :param numerators: Per-cycle values of each term with its coefficient
+        :return: Ratio and half width
+        """
+        length = self.lengths.mean()
+        ratio = sum(coefficient * values.mean() for values, coefficient in numerators) / length
+        variance = sum(coefficient**2 * values.var(ddof=1) / len(values) for values, coefficient in numerators)
+        variance += ratio**2 * self.lengths.var(ddof=1) / len(self.lengths)
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        return float(ratio), float(z * sqrt(variance) / length)
+
+    def handover_failure(self) -> tuple:
+        """
+        :return: Handover failure probability of previous run and its confidence interval half width
+        """
+        return self.ratio([(self.top, 1)])
+
+    def newcall_blocking(self) -> tuple:
+        """
+        :return: New call blocking probability of previous run and its confidence interval half width
+        """
+        return self.ratio([(self.above, 1)])
+
+    def blocking_probability(self) -> float:
+        """
+        Obtain aggregated blocking probability of previous run
+        :return: Blocking probability
+        """
+        return self.ratio([(self.above, 1), (self.top, 10)])[0]
+
+    def crude_arrivals(self) -> float:
+        """
+        Arrivals crude simulation would need for a handover failure interval of the same width
+        :return: Number of arrivals, infinite when no interval width is reachable
+        """
+        HFP, half_width = self.handover_failure()
+        # Without handovers crude simulation never observes a failure
+        if half_width == 0 or self.handover_rate == 0:
+            return float("inf")
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        handovers = z**2 * HFP * (1 - HFP) / half_width**2
+        return handovers * (self.handover_rate + self.newcall_rate) / self.handover_rate
+
+    def summary(self) -> dict:
+        """
+        Obtain estimates of previous run
+        :return: Dictionary of run outcomes
+        """
+        HFP, HFP_ci = self.handover_failure()
+        CBP, CBP_ci = self.newcall_blocking()
+        ABP, ABP_ci = self.ratio([(self.above, 1), (self.top, 10)])
+        return {"handover_failure": HFP,
+                "handover_failure_ci": HFP_ci,
+                "newcall_blocking": CBP,
+                "newcall_blocking_ci": CBP_ci,
+                "blocking_probability": ABP,
+                "blocking_probability_ci": ABP_ci,
+                "cycles": len(self.top),
+                "crude_cycles": len(self.lengths),
+                "events": self.events,
+                "crude_arrivals": self.crude_arrivals()}
@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+from hashlib import sha256
+from json import dumps, loads
+from os import getpid, makedirs, remove, replace, scandir, stat, utime
+from os.path import join
+
+import numpy
+from numpy.random import SeedSequence
+
+from Variates import Variates
+
+# File locking is only available on POSIX, elsewhere writes stay atomic but eviction is unlocked
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class ResultCache:
+    """
+    On-disk store of run summaries, addressed by a hash of the model, its parameters and the engine version
+    """
+
+    # Bump whenever a change to the engines alters the results of a seeded run, invalidating every entry
+    ENGINE_VERSION = 1
+    # Fraction of the size bound eviction brings the cache down to, so it does not run on every write
+    EVICTION_TARGET = 0.9
+
+    def __init__(self, directory: str, max_bytes: int = None):
+        """
+        Initialisation
+        :param directory: Directory entries are stored in, created if missing
+        :param max_bytes: Bound on the total size of entries, least recently used are evicted beyond it, or None
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        makedirs(directory, exist_ok=True)
+
+    def describe(value):
+        """
+        JSON form of a parameter value for hashing
+        :param value: Parameter value
+        :return: Value with seeds, variate sources and numpy types replaced by plain equivalents
+        """
+        if isinstance(value, SeedSequence):
+            return {"entropy": value.entropy, "spawn_key": list(value.spawn_key)}
+        if isinstance(value, Variates):
+            return repr(value)
+        if isinstance(value, (numpy.generic, numpy.ndarray)):
+            return value.tolist()
+        return value
+
+    def key(model: type, parameters: dict) -> str:
+        """
+        Address of the result of a run. Unseeded runs are addressed too, as seed None, so that an
+        interrupted sweep can skip what it has finished
+        :param model: Simulation class
+        :param parameters: Keyword arguments of run, including the seed
+        :return: Hex digest
+        """
+        content = {"model": model.__name__, "engine": ResultCache.ENGINE_VERSION,
+                   "parameters": {name: ResultCache.describe(value) for name, value in parameters.items()}}
+        return sha256(dumps(content, sort_keys=True, default=repr).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        :param key: Address of an entry
+        :return: File of the entry, spread over subdirectories by the first byte of the key
+        """
+        return join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str):
+        """
+        Look up an entry, marking it as recently used
+        :param key: Address of an entry
+        :return: Stored summary, or None if absent
+        """
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                summary = loads(f.read())
+        except FileNotFoundError:
+            return None
+        # An entry evicted by another process in between is simply not marked
+        try:
+            utime(path)
+        except FileNotFoundError:
+            pass
+        return summary
+
+    def put(self, key: str, summary: dict):
+        """
+        Store an entry atomically, evicting the least recently used entries if over the size bound
+        :param key: Address of an entry
+        :param summary: Summary of the run
+        """
+        data = dumps(summary).encode()
+        path = self.path(key)
+        makedirs(join(self.directory, key[:2]), exist_ok=True)
+        # Each process writes its own temporary file, so concurrent writers of an entry cannot interleave
+        temporary = path + "." + str(getpid()) + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+
+        # Every handle keeps the size account, bounded or not, so a bound set later starts from the true total
+        with self.lock():
+            size = self.size()
+            try:
+                size -= stat(path).st_size
+            except FileNotFoundError:
+                pass
+            replace(temporary, path)
+            size += len(data)
+            if self.max_bytes is not None and size > self.max_bytes:
+                size = self.evict()
+            self.record(size)
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold the cache lock, serialising size accounting and eviction between processes
+        """
+        with open(join(self.directory, ".lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def size(self) -> int:
+        """
+        :return: Total size of entries as last recorded, a running account corrected on each eviction, counted
+        from the entries if never recorded
+        """
+        try:
+            with open(join(self.directory, ".size")) as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return sum(entry[1] for entry in self.entries())
+
+    def record(self, size: int):
+        """
+        :param size: Total size of entries to record
+        """
+        with open(join(self.directory, ".size"), "w") as f:
+            f.write(str(size))
+
+    def entries(self) -> list:
+        """
+        :return: Path, size and last use of every entry
+        """
+        entries = []
+        for directory in scandir(self.directory):
+            if directory.is_dir():
+                for entry in scandir(directory.path):
+                    if entry.name.endswith(".json"):
+                        status = entry.stat()
+                        entries.append((entry.path, status.st_size, status.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache is within the eviction target, called holding the lock
+        :return: Total size of the remaining entries
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        target = ResultCache.EVICTION_TARGET * self.max_bytes
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        return size
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        with self.lock():
+            for path, _, _ in self.entries():
+                remove(path)
+            self.record(0)
@@ -0,0 +1,77 @@
+from Event import Event
+from EventVariant import EventVariant
+from Instrumentation import Proxy
+
+
+class ScoredEvents(Proxy):
+    """
+    Proxy of an EventHandler that accumulates the score of every exponential draw scheduled through it, the
+    derivative of its log density with respect to its rate, 1 / rate - x for a draw x
+    """
+
+    def __init__(self, target, arrival_rates: list, departure_rate: float):
+        """
+        Initialisation
+        :param target: EventHandler being wrapped
+        :param arrival_rates: Arrival rate of each path, one for events without paths
+        :param departure_rate: Departure rate of events
+        """
+        super().__init__(target)
+        self.arrival_rates = arrival_rates
+        self.departure_rate = departure_rate
+        # Cumulative score of each arrival rate followed by the departure rate
+        self.scores = [0.0] * (len(arrival_rates) + 1)
+        self.time = 0.0
+
+    def next(self) -> Event:
+        """
+        Take the next event, keeping the time arrivals are scheduled from
+        :return: Next event
+        """
+        event = self.target.next()
+        self.time = event.key
+        return event
+
+    def add(self, event: Event):
+        """
+        Add event, scoring the inter-arrival time of a new arrival or the holding time of a served call
+        :param event: Event to add
+        """
+        if event.kind == Event.ARRIVAL:
+            path = event.path_id if isinstance(event, EventVariant) else 0
+            self.scores[path] += 1 / self.arrival_rates[path] - (event.key - self.time)
+        else:
+            self.scores[-1] += 1 / self.departure_rate - (event.departure_time - event.arrival_time)
+        self.target.add(event)
+
+
+class Sensitivity:
+    """
+    Likelihood ratio estimates of the derivatives of a batch value with respect to the rates of a run
+    """
+
+    # Batches whose draws a batch value is credited with, the batch itself and those before it that
+    # set its starting state, enough once a batch spans many holding times
+    WINDOW = 2
+
+    def derivatives(values: list, scores: list, first: int) -> list:
+        """
+        Derivative of the mean batch value with respect to each rate. The draws that shaped a batch are
+        those of the batch and the few before it, so each value is weighted by their summed scores. The
+        values are centred first, which leaves the estimate unbiased as a score has mean zero but removes
+        most of its variance
+        :param values: Values of the batches kept
+        :param scores: Cumulative scores at every batch boundary from the run start
+        :param first: Boundary index the kept batches start at
+        :return: Derivative with respect to each rate
+        """
+        if not values:
+            return [float("nan")] * (len(scores[0]) if scores else 0)
+        mean = sum(values) / len(values)
+        derivatives = [0.0] * len(scores[0])
+        for i, value in enumerate(values):
+            end = scores[first + i + 1]
+            start = scores[max(first + i + 1 - Sensitivity.WINDOW, 0)]
+            for j in range(len(derivatives)):
+                derivatives[j] += (value - mean) * (end[j] - start[j])
+        return [derivative / len(values) for derivative in derivatives]
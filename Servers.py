@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Servers:
     """
     Manager for Servers
@@ -8,8 +11,11 @@ class Servers:
         Initialise servers
         :param server_number: Number of servers
         """
-        self.free = list(range(1, server_number+1))
-        self.busy = []
+        self.server_number = server_number
+        self.free = deque(range(1, server_number+1))
+        # Busy flag per server ID, index 0 unused
+        self.busy = bytearray(server_number+1)
+        self.busy_number = 0
 
     def __len__(self) -> int:
         """
@@ -22,15 +28,30 @@ class Servers:
         Check if any servers are free
         :return: True if a server is free, else false
         """
-        return len(self) > 0
+        return len(self.free) > 0
+
+    def is_busy(self, server: int) -> bool:
+        """
+        Check if a given server is busy
+        :param server: Server ID
+        :return: True if server is busy, else false
+        """
+        return self.busy[server] == 1
+
+    def busy_count(self) -> int:
+        """
+        :return: Number of busy servers
+        """
+        return self.busy_number
 
     def allocate(self) -> int:
         """
         Allocate server
         :return: Server ID
         """
-        server, self.free = self.free[0], self.free[1:]
-        self.busy.append(server)
+        server = self.free.popleft()
+        self.busy[server] = 1
+        self.busy_number += 1
         return server
 
     def deallocate(self, server: int):
@@ -38,5 +59,8 @@ class Servers:
         Free server
         :param server: Server to deallocate
         """
-        self.busy.remove(server)
+        if not self.busy[server]:
+            raise ValueError("Server " + str(server) + " is not busy")
+        self.busy[server] = 0
+        self.busy_number -= 1
         self.free.append(server)
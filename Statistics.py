@@ -0,0 +1,201 @@
+from math import pi, sqrt, tan
+from statistics import NormalDist
+
+
+class Statistics:
+    """
+    Streaming accumulator holding count, sum, mean and variance of observed values
+    """
+
+    def __init__(self):
+        """
+        Initialisation
+        """
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.squares = 0.0
+
+    def __len__(self) -> int:
+        """
+        :return: Number of observations
+        """
+        return self.count
+
+    def add(self, value: float):
+        """
+        Add observation, updating mean and variance with Welford's method
+        :param value: Observed value
+        """
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        """
+        :return: Sample variance of observations
+        """
+        if self.count < 2:
+            return 0.0
+        return self.squares / (self.count - 1)
+
+    def deviation(self) -> float:
+        """
+        :return: Sample standard deviation of observations
+        """
+        return sqrt(self.variance())
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """
+        Half width of the Student t confidence interval of the mean
+        :param confidence: Confidence level
+        :return: Half width, infinite with fewer than two observations
+        """
+        if self.count < 2:
+            return float("inf")
+        return Statistics.t_quantile(0.5 + confidence / 2, self.count - 1) * self.deviation() / sqrt(self.count)
+
+    def covariance(x: list, y: list) -> float:
+        """
+        Sample covariance of paired observations
+        :param x: First values
+        :param y: Second values, paired with x
+        :return: Sample covariance, 0 with fewer than two pairs
+        """
+        if len(x) < 2:
+            return 0.0
+        x_mean, y_mean = sum(x) / len(x), sum(y) / len(y)
+        return sum((a - x_mean) * (b - y_mean) for a, b in zip(x, y)) / (len(x) - 1)
+
+    def t_quantile(p: float, df: int) -> float:
+        """
+        Quantile of the Student t distribution by Cornish-Fisher expansion of the normal quantile
+        :param p: Probability
+        :param df: Degrees of freedom
+        :return: Quantile
+        """
+        # Exact forms where the expansion is poor
+        if df == 1:
+            return tan(pi * (p - 0.5))
+        if df == 2:
+            return (2*p - 1) / sqrt(2 * p * (1 - p))
+
+        z = NormalDist().inv_cdf(p)
+        g1 = (z**3 + z) / 4
+        g2 = (5*z**5 + 16*z**3 + 3*z) / 96
+        g3 = (3*z**7 + 19*z**5 + 17*z**3 - 15*z) / 384
+        g4 = (79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z) / 92160
+        return z + g1/df + g2/df**2 + g3/df**3 + g4/df**4
+
+
+class BatchMeans(Statistics):
+    """
+    Statistics over the values of consecutive batches of a run, keeping the batch series
+    """
+
+    def __init__(self, batch_size: int):
+        """
+        Initialisation
+        :param batch_size: Number of arrivals per batch
+        """
+        super().__init__()
+        self.batch_size = batch_size
+        self.values = []
+
+    def add(self, value: float):
+        """
+        Add value of a completed batch
+        :param value: Batch value
+        """
+        super().add(value)
+        self.values.append(value)
+
+    def precision(self, confidence: float = 0.95) -> float:
+        """
+        Relative half width of the confidence interval of the mean
+        :param confidence: Confidence level
+        :return: Half width over mean, infinite while the mean is zero
+        """
+        if self.mean == 0:
+            return float("inf")
+        return self.half_width(confidence) / abs(self.mean)
+
+    def truncation(self) -> int:
+        """
+        Warm-up length by the MSER rule, the number of leading batches whose removal minimises
+        the squared standard error of the remaining mean, searched over the first half
+        :return: Number of batches to drop
+        """
+        best, drop = float("inf"), 0
+        count, total, squares = 0, 0.0, 0.0
+        # Accumulate from the end so each candidate is evaluated in constant time
+        for d in range(len(self.values) - 1, -1, -1):
+            value = self.values[d]
+            count += 1
+            total += value
+            squares += value * value
+            if d <= len(self.values) // 2:
+                error = (squares - total * total / count) / (count * count)
+                if error <= best:
+                    best, drop = error, d
+        return drop
+
+
+class Occupancy:
+    """
+    Time-weighted histogram of the number of busy servers, accumulated one event at a time
+    """
+
+    def __init__(self, server_number: int):
+        """
+        Initialisation
+        :param server_number: Number of servers, the histogram has a state for 0 to server_number busy
+        """
+        self.times = [0.0] * (server_number + 1)
+        self.last = 0.0
+
+    def add(self, time: float, busy: int):
+        """
+        Credit the time since the previous event to the number of servers busy throughout it
+        :param time: Time of the event about to change the state
+        :param busy: Busy servers before the event
+        """
+        self.times[busy] += time - self.last
+        self.last = time
+
+    def since(self, origin: list) -> list:
+        """
+        :param origin: Copy of times at an earlier point, as a list or array, or None for the start
+        :return: Time spent in each state after the origin
+        """
+        if origin is None:
+            return list(self.times)
+        return [t - float(o) for t, o in zip(self.times, origin)]
+
+    def distribution(self, origin: list = None) -> list:
+        """
+        :param origin: Copy of times at an earlier point, or None for the start
+        :return: Fraction of time spent with each number of servers busy
+        """
+        times = self.since(origin)
+        total = sum(times)
+        return [t / total if total else 0.0 for t in times]
+
+    def mean(self, origin: list = None) -> float:
+        """
+        :param origin: Copy of times at an earlier point, or None for the start
+        :return: Time-averaged number of busy servers
+        """
+        return sum(k * p for k, p in enumerate(self.distribution(origin)))
+
+    def tail(self, busy: int, origin: list = None) -> float:
+        """
+        By PASTA, the probability an arrival finds at least the given number of servers busy
+        :param busy: Number of busy servers
+        :param origin: Copy of times at an earlier point, or None for the start
+        :return: Fraction of time with at least busy servers busy
+        """
+        return sum(self.distribution(origin)[busy:])
+
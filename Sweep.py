@@ -0,0 +1,244 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from math import sqrt
+from os import cpu_count
+
+import numpy
+from numpy.random import SeedSequence
+
+from Event import Event
+from ResultCache import ResultCache
+from Statistics import Statistics
+from Variates import Variates
+
+
+def _start_worker():
+    """
+    Give a worker process its own variate source, forked workers would otherwise share one state
+    """
+    Event.VARIATES = Variates()
+
+
+def _run_point(model: type, parameters: dict, cache: ResultCache = None, control: bool = False) -> dict:
+    """
+    Run one simulation in a worker process, or load its result if already cached
+    :param model: Simulation class, MMCC or a subclass
+    :param parameters: Keyword arguments of run
+    :param cache: Cache holding the summary of completed runs, or None
+    :param control: Add the control variate of the run and its expectation to the summary
+    :return: Summary of the run
+    """
+    if cache is not None:
+        key = ResultCache.key(model, dict(parameters, control=True) if control else parameters)
+        summary = cache.get(key)
+        if summary is not None:
+            return summary
+
+    machine = model()
+    machine.run(**parameters)
+    summary = machine.summary()
+    if control:
+        summary["control"], summary["control_mean"] = machine.control()
+
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
+
+
+class Sweep:
+    """
+    Runs a simulation model over a grid of parameters on a pool of processes
+    """
+
+    def __init__(self, model: type, workers: int = None):
+        """
+        Initialisation
+        :param model: Simulation class, MMCC or a subclass
+        :param workers: Number of processes, all cores if None
+        """
+        self.model = model
+        self.workers = workers or cpu_count()
+
+    def points(self, grid: dict) -> list:
+        """
+        Expand a parameter grid, the last parameter varying fastest
+        :param grid: Values of each swept parameter of run
+        :return: List of parameter dictionaries
+        """
+        names = list(grid)
+        return [dict(zip(names, values)) for values in product(*grid.values())]
+
+    def run(self, grid: dict, replications: int = 1, seed=None, confidence: float = 0.95,
+            directory=None, common: bool = False, antithetic: bool = False, control: bool = False,
+            **fixed) -> numpy.ndarray:
+        """
+        Run the model at every point of the grid
+        :param grid: Values of each swept parameter of run
+        :param replications: Independent replications run at each point
+        :param seed: Integer seed or SeedSequence of the sweep, unseeded runs if None and one replication
+        :param confidence: Confidence level of the intervals reported with replications
+        :param directory: ResultCache, or directory of one, results are stored in as runs complete, runs
+        found there are skipped
+        :param common: Drive every point with the same random numbers, replication by replication
+        :param antithetic: Run replications as antithetic pairs, replications must be even
+        :param control: Adjust blocking probability with the control variate of the model
+        :param fixed: Parameters of run shared by every point
+        :return: Structured array with the parameters and summary of each point, in grid order, with
+        variance_reduction for antithetic or control runs and difference_reduction for common ones
+        """
+        if antithetic and replications % 2:
+            raise ValueError("Antithetic replications must be even, got " + str(replications))
+
+        points = self.points(grid)
+        parameters = [dict(fixed, **point) for point in points]
+
+        # Every run gets its own spawned stream, so results do not depend on how runs are scheduled
+        if seed is not None or replications > 1 or common or antithetic:
+            sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+            count = replications // 2 if antithetic else replications
+            # With common random numbers every point reuses the same replication streams
+            if common:
+                sequences = [sequence.spawn(count)] * len(points)
+            else:
+                sequences = [point_sequence.spawn(count) for point_sequence in sequence.spawn(len(points))]
+            parameters = [dict(p, seed=s) for p, point_sequences in zip(parameters, sequences)
+                          for s in Sweep.seeds(point_sequences, common, antithetic)]
+
+        cache = directory
+        if directory is not None and not isinstance(directory, ResultCache):
+            cache = ResultCache(directory)
+
+        if self.workers == 1:
+            summaries = [_run_point(self.model, p, cache, control) for p in parameters]
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=_start_worker) as executor:
+                chunk = max(1, len(parameters) // (4 * self.workers))
+                summaries = list(executor.map(_run_point, [self.model] * len(parameters), parameters,
+                                              [cache] * len(parameters), [control] * len(parameters),
+                                              chunksize=chunk))
+
+        if replications > 1:
+            groups = [summaries[i:i + replications] for i in range(0, len(summaries), replications)]
+            summaries = [Sweep.aggregate(group, confidence, antithetic, control) for group in groups]
+            if common:
+                Sweep.difference_reduction(groups, summaries, antithetic, control)
+
+        return Sweep.table(points, summaries)
+
+    def seeds(sequences: list, common: bool, antithetic: bool) -> list:
+        """
+        Seeds of the replications of one point
+        :param sequences: SeedSequence of each replication, or of each pair when antithetic
+        :param common: Synchronise streams for common random numbers
+        :param antithetic: Pair consecutive replications as antithetic members
+        :return: List of seeds for run
+        """
+        if not (common or antithetic):
+            return sequences
+        if not antithetic:
+            return [Variates(s, common=common) for s in sequences]
+        return [Variates(s, antithetic=member, common=common) for s in sequences for member in (0, 1)]
+
+    def units(summaries: list, antithetic: bool, control: bool) -> tuple:
+        """
+        Independent observations of blocking probability among replications, antithetic pairs being
+        averaged and the control variate adjusted for
+        :param summaries: Summary dictionary of each replication
+        :param antithetic: Replications are antithetic pairs
+        :param control: Adjust with the control variate
+        :return: Units of the summaries and their blocking probability observations
+        """
+        units = summaries
+        if antithetic:
+            units = [{name: (a[name] + b[name]) / 2 for name in a} for a, b in zip(summaries[::2], summaries[1::2])]
+        observed = [unit["blocking_probability"] for unit in units]
+
+        # Regression coefficient of blocking on the control, estimated from the same replications
+        if control:
+            controls = [unit["control"] for unit in units]
+            spread = Statistics.covariance(controls, controls)
+            coefficient = Statistics.covariance(observed, controls) / spread if spread else 0.0
+            observed = [y - coefficient * (x - unit["control_mean"])
+                        for y, x, unit in zip(observed, controls, units)]
+        return units, observed
+
+    def difference_reduction(groups: list, summaries: list, antithetic: bool, control: bool):
+        """
+        Add to each aggregated summary the ratio of the variance the difference of blocking from the
+        previous point would have with independent streams to its variance under common random numbers
+        :param groups: Replication summaries of each point
+        :param summaries: Aggregated summary of each point, updated
+        :param antithetic: Replications are antithetic pairs
+        :param control: Adjust with the control variate
+        """
+        observed = [Sweep.units(group, antithetic, control)[1] for group in groups]
+        summaries[0]["difference_reduction"] = float("nan")
+        for i in range(1, len(groups)):
+            previous, current = observed[i - 1], observed[i]
+            differences = [c - p for c, p in zip(current, previous)]
+            spread = Statistics.covariance(differences, differences)
+            independent = Statistics.covariance(previous, previous) + Statistics.covariance(current, current)
+            summaries[i]["difference_reduction"] = independent / spread if spread else float("inf")
+
+    def replicate(self, replications: int, seed=None, confidence: float = 0.95, **parameters) -> numpy.void:
+        """
+        Run independent replications of a single configuration
+        :param replications: Number of replications
+        :param seed: Integer seed or SeedSequence of the replications
+        :param confidence: Confidence level of the intervals
+        :param parameters: Parameters of run
+        :return: Record of replication means and confidence interval half widths
+        """
+        return self.run({}, replications, seed, confidence, **parameters)[0]
+
+    def aggregate(summaries: list, confidence: float, antithetic: bool = False, control: bool = False) -> dict:
+        """
+        Combine summaries of replications into means and confidence interval half widths
+        :param summaries: Summary dictionary of each replication
+        :param confidence: Confidence level of the intervals
+        :param antithetic: Replications are antithetic pairs, intervals are taken over pair means
+        :param control: Adjust blocking probability with the control variate in the summaries
+        :return: Dictionary with the mean of each value and its half width suffixed by _ci, and with
+        antithetic pairs or a control the variance reduction of blocking probability per replication
+        """
+        units, observed = Sweep.units(summaries, antithetic, control)
+        aggregated = {}
+        for name in units[0]:
+            if name in ("control", "control_mean"):
+                continue
+            statistics = Statistics()
+            for unit in units:
+                statistics.add(unit[name])
+            aggregated[name] = statistics.mean
+            aggregated[name + "_ci"] = statistics.half_width(confidence)
+
+        if antithetic or control:
+            statistics = Statistics()
+            for value in observed:
+                statistics.add(value)
+            # A fitted control costs a further degree of freedom
+            df = statistics.count - 1 - control
+            aggregated["blocking_probability"] = statistics.mean
+            aggregated["blocking_probability_ci"] = float("inf") if df < 1 else \
+                Statistics.t_quantile(0.5 + confidence / 2, df) * statistics.deviation() / sqrt(statistics.count)
+
+            # Variance per replication of the plain estimator over that of the reduced one
+            plain = Statistics()
+            for summary in summaries:
+                plain.add(summary["blocking_probability"])
+            reduced = statistics.variance() * len(summaries) / len(units)
+            aggregated["variance_reduction"] = plain.variance() / reduced if reduced else float("inf")
+        aggregated["replications"] = len(summaries)
+        return aggregated
+
+    def table(points: list, summaries: list) -> numpy.ndarray:
+        """
+        Combine grid points and run summaries into a structured array
+        :param points: Parameter dictionary of each point
+        :param summaries: Summary dictionary of each point
+        :return: Structured array with one record per point
+        """
+        rows = [dict(point, **summary) for point, summary in zip(points, summaries)]
+        names = list(rows[0]) if rows else []
+        dtype = [(name, numpy.asarray([row[name] for row in rows]).dtype) for name in names]
+        return numpy.array([tuple(row[name] for name in names) for row in rows], dtype=dtype)
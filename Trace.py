@@ -0,0 +1,258 @@
+from os import SEEK_END
+
+import numpy
+
+from Event import Event
+from EventVariant import EventVariant
+from Instrumentation import Proxy
+from Statistics import Occupancy
+
+
+class TraceWriter:
+    """
+    Streams the event records of a run to a fixed-width binary file in chunks
+    """
+
+    # Record layout, the path is 0 for runs without paths and the server is 0 for blocked arrivals
+    RECORD = numpy.dtype([("time", "<f8"), ("kind", "u1"), ("path", "u1"), ("server", "<u4"), ("call", "<u8")])
+    # Kinds of record
+    ADMITTED = 0
+    DEPARTED = 1
+    BLOCKED = 2
+    PREFILLED = 3
+    # Last record of a finished run, its call field holding the arrivals discarded as warm-up
+    WARMUP = 4
+    # File header, magic followed by the number of servers and whether calls have paths
+    MAGIC = b"CMWSTRC1"
+    HEADER = 16
+    # Records buffered before a chunk is written
+    CHUNK = 65536
+
+    def __init__(self, path: str, server_number: int, paths: bool = False):
+        """
+        Initialisation
+        :param path: Trace file, overwritten
+        :param server_number: Number of servers of the run
+        :param paths: Whether calls arrive on handover and new call paths
+        """
+        self.path = path
+        self.records = []
+        self.written = 0
+        self.calls = 0
+        self.file = open(path, "wb")
+        self.file.write(TraceWriter.MAGIC + numpy.array([server_number, paths], dtype="<u4").tobytes())
+
+    def __getstate__(self) -> dict:
+        """
+        Flush and drop the file handle, so a checkpoint records how much of the trace is valid
+        :return: State of writer
+        """
+        self.flush()
+        state = dict(self.__dict__)
+        del state["file"]
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Reopen the trace, discarding records written after the checkpoint
+        :param state: State from __getstate__
+        """
+        self.__dict__.update(state)
+        self.file = open(self.path, "r+b")
+        self.file.truncate(TraceWriter.HEADER + self.written * TraceWriter.RECORD.itemsize)
+        self.file.seek(0, SEEK_END)
+
+    def record(self, time: float, kind: int, path: int, server: int, call: int):
+        """
+        Buffer a record, writing a chunk when the buffer is full
+        :param time: Simulation time
+        :param kind: ADMITTED, DEPARTED, BLOCKED, PREFILLED or WARMUP
+        :param path: Path ID of the call
+        :param server: Server ID, 0 if none
+        :param call: Call ID
+        """
+        self.records.append((time, kind, path, server, call))
+        if len(self.records) >= TraceWriter.CHUNK:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered records
+        """
+        if self.records:
+            numpy.array(self.records, dtype=TraceWriter.RECORD).tofile(self.file)
+            self.written += len(self.records)
+            self.records = []
+        self.file.flush()
+
+    def close(self):
+        """
+        Write buffered records and close the file
+        """
+        self.flush()
+        self.file.close()
+
+
+class TracedEvents(Proxy):
+    """
+    Proxy of an EventHandler that records admissions, blocks and departures to a TraceWriter
+    """
+
+    def __init__(self, target, writer: TraceWriter):
+        """
+        Initialisation, recording calls already in service as prefilled
+        :param target: EventHandler being wrapped
+        :param writer: Trace being written
+        """
+        super().__init__(target)
+        self.writer = writer
+        for _, _, event in sorted(target.upcoming):
+            if event.kind == Event.DEPARTURE:
+                self.admit(event, TraceWriter.PREFILLED)
+
+    def add(self, event: Event):
+        """
+        Add event, recording an admission when a served call is scheduled to depart
+        :param event: Event to add
+        """
+        if event.kind == Event.DEPARTURE:
+            self.admit(event, TraceWriter.ADMITTED)
+        self.target.add(event)
+
+    def admit(self, event: Event, kind: int):
+        """
+        Give a call in service its call ID and record it
+        :param event: Event being served
+        :param kind: ADMITTED or PREFILLED
+        """
+        event.call_id = self.writer.calls
+        self.writer.calls += 1
+        self.writer.record(event.arrival_time, kind, TracedEvents.path(event), event.server_id, event.call_id)
+
+    def block(self, event: Event):
+        """
+        Place blocked event, recording it
+        :param event: Event being blocked
+        """
+        self.writer.record(event.arrival_time, TraceWriter.BLOCKED, TracedEvents.path(event), 0, self.writer.calls)
+        self.writer.calls += 1
+        self.target.block(event)
+
+    def depart(self, event: Event):
+        """
+        Place departed event, recording it
+        :param event: Event departing
+        """
+        self.writer.record(event.departure_time, TraceWriter.DEPARTED, TracedEvents.path(event),
+                           event.server_id, event.call_id)
+        self.target.depart(event)
+
+    def path(event: Event) -> int:
+        """
+        :param event: Event being recorded
+        :return: Path ID of event, 0 for events without paths
+        """
+        return event.path_id if isinstance(event, EventVariant) else 0
+
+
+class Trace:
+    """
+    Memory-mapped view of a trace file, with replay of the run metrics
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialisation
+        :param path: Trace file written by TraceWriter
+        """
+        with open(path, "rb") as f:
+            header = f.read(TraceWriter.HEADER)
+        if header[:8] != TraceWriter.MAGIC:
+            raise ValueError(path + " is not an event trace")
+        self.server_number, self.paths = (int(x) for x in numpy.frombuffer(header[8:16], dtype="<u4"))
+        self.records = numpy.memmap(path, dtype=TraceWriter.RECORD, mode="r", offset=TraceWriter.HEADER)
+        # A finished run ends with the warm-up boundary, an interrupted one is replayed whole
+        self.warmup_arrivals = 0
+        if len(self.records) and self.records["kind"][-1] == TraceWriter.WARMUP:
+            self.warmup_arrivals = int(self.records["call"][-1])
+            self.records = self.records[:-1]
+
+    def __len__(self) -> int:
+        """
+        :return: Number of records
+        """
+        return len(self.records)
+
+    def start(self) -> int:
+        """
+        :return: Index of the first record after the warm-up, the one after the last warm-up arrival
+        """
+        if not self.warmup_arrivals:
+            return 0
+        kind = self.records["kind"]
+        arrivals = numpy.flatnonzero((kind == TraceWriter.ADMITTED) | (kind == TraceWriter.BLOCKED))
+        return int(arrivals[self.warmup_arrivals - 1]) + 1
+
+    def counts(self) -> dict:
+        """
+        Arrivals and blocked arrivals per path ID after the warm-up
+        :return: Dictionary of path ID to (arrivals, blocked)
+        """
+        records = self.records[self.start():]
+        kind, path = records["kind"], records["path"]
+        arrivals = (kind == TraceWriter.ADMITTED) | (kind == TraceWriter.BLOCKED)
+        blocked = kind == TraceWriter.BLOCKED
+        return {int(p): (int(numpy.count_nonzero(arrivals & (path == p))),
+                         int(numpy.count_nonzero(blocked & (path == p)))) for p in numpy.unique(path[arrivals])}
+
+    def blocking_probability(self) -> float:
+        """
+        Recompute blocking probability, the ABP when the trace has both paths
+        :return: Blocking probability
+        """
+        counts = self.counts()
+        ratios = {path: blocked / arrivals for path, (arrivals, blocked) in counts.items()}
+        if not self.paths:
+            return ratios.get(0, 0)
+        return ratios.get(EventVariant.NEWCALL, 0) + (10 * ratios.get(EventVariant.HANDOVER, 0))
+
+    def service_times(self) -> numpy.ndarray:
+        """
+        Service times of departed calls, matching each departure with its admission by call ID
+        :return: Array of service times
+        """
+        records = self.records
+        admitted = records[(records["kind"] == TraceWriter.ADMITTED) | (records["kind"] == TraceWriter.PREFILLED)]
+        departed = records[records["kind"] == TraceWriter.DEPARTED]
+        arrival = numpy.zeros(int(records["call"].max()) + 1 if len(records) else 0)
+        arrival[admitted["call"]] = admitted["time"]
+        return departed["time"] - arrival[departed["call"]]
+
+    def occupancy(self) -> Occupancy:
+        """
+        Rebuild the time-weighted occupancy of the run after the warm-up, each record after an admission
+        or departure crediting the time since the previous record to the servers busy throughout it
+        :return: Occupancy up to the last record
+        """
+        records = self.records
+        occupancy = Occupancy(self.server_number)
+        if not len(records):
+            return occupancy
+        kind = records["kind"]
+        change = numpy.where((kind == TraceWriter.ADMITTED) | (kind == TraceWriter.PREFILLED), 1,
+                             numpy.where(kind == TraceWriter.DEPARTED, -1, 0))
+        busy = numpy.concatenate(([0], numpy.cumsum(change)[:-1]))
+        durations = numpy.diff(records["time"], prepend=0.0)
+        start = self.start()
+        occupancy.times = numpy.bincount(busy[start:], weights=durations[start:],
+                                         minlength=self.server_number + 1).tolist()
+        occupancy.last = float(records["time"][-1])
+        return occupancy
+
+    def server_utilisation(self) -> float:
+        """
+        Recompute server utilisation as the time-averaged number of busy servers
+        :return: Server utilisation
+        """
+        return self.occupancy().mean()
+
@@ -0,0 +1,122 @@
+from zlib import crc32
+
+import numpy
+from numpy.random import SeedSequence, default_rng
+
+
+class Variates:
+    """
+    Buffered source of random variates with an independent generator per named stream
+    """
+
+    # Number of draws generated each time a stream buffer runs out
+    BLOCK_SIZE = 4096
+    # Largest uniform drawn, reflecting a draw about half of it maps the grid of uniforms onto itself
+    UNIFORM_MAX = 1 - 2**-53
+
+    def __init__(self, seed=None, antithetic: int = None, common: bool = False):
+        """
+        Initialisation
+        :param seed: Integer seed or SeedSequence, random entropy if None
+        :param antithetic: Member 0 or 1 of an antithetic pair, whose uniforms are reflected, or None
+        :param common: Keep streams synchronised between configurations for common random numbers, so
+        each call consumes the same draws whether or not it is served
+        """
+        self.seed_sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self.antithetic = antithetic
+        self.common = common
+        self.generators = {}
+        self.buffers = {}
+        self.samples = {}
+
+    def __repr__(self) -> str:
+        """
+        :return: Description that identifies the draws of the source
+        """
+        return "Variates({}, {}, antithetic={}, common={})".format(
+            self.seed_sequence.entropy, self.seed_sequence.spawn_key, self.antithetic, self.common)
+
+    def of(seed, default: "Variates") -> "Variates":
+        """
+        Variate source of a run
+        :param seed: Integer seed, SeedSequence or Variates of the run, or None
+        :param default: Source used when seed is None
+        :return: Variates
+        """
+        if seed is None:
+            return default
+        return seed if isinstance(seed, Variates) else Variates(seed)
+
+    def generator(self, stream: str):
+        """
+        Get generator of a stream, created from the seed and the stream name
+        :param stream: Name of stream
+        :return: Numpy Generator for the stream
+        """
+        if stream not in self.generators:
+            sequence = SeedSequence(self.seed_sequence.entropy,
+                                    spawn_key=self.seed_sequence.spawn_key + (crc32(stream.encode()),))
+            self.generators[stream] = default_rng(sequence)
+        return self.generators[stream]
+
+    def uniforms(self, stream: str, size: int) -> numpy.ndarray:
+        """
+        Draw uniform variates on [0, 1), reflected for the second member of an antithetic pair
+        :param stream: Name of stream
+        :param size: Number of draws
+        :return: Array of uniform variates
+        """
+        uniforms = self.generator(stream).random(size)
+        if self.antithetic:
+            uniforms = Variates.UNIFORM_MAX - uniforms
+        return uniforms
+
+    def fill(self, stream: str) -> list:
+        """
+        Refill buffer of a stream with standard exponential draws, by inversion of uniforms in an antithetic pair
+        :param stream: Name of stream
+        :return: Refilled buffer
+        """
+        if self.antithetic is None:
+            buffer = self.generator(stream).standard_exponential(Variates.BLOCK_SIZE).tolist()
+        else:
+            buffer = (-numpy.log1p(-self.uniforms(stream, Variates.BLOCK_SIZE))).tolist()
+        self.buffers[stream] = buffer
+        return buffer
+
+    def block(self, stream: str, size: int = None) -> list:
+        """
+        Draw a block of uniform variates on [0, 1) for callers that index draws themselves
+        :param stream: Name of stream
+        :param size: Number of draws, BLOCK_SIZE if None
+        :return: List of uniform variates
+        """
+        return self.uniforms(stream, size or Variates.BLOCK_SIZE).tolist()
+
+    def exponential(self, stream: str, rate: float) -> float:
+        """
+        Draw from exponential distribution with given rate
+        :param stream: Name of stream
+        :param rate: Rate of distribution, 0 for a stream that never fires
+        :return: Exponential variate, infinite for a rate of 0
+        """
+        buffer = self.buffers.get(stream)
+        if not buffer:
+            buffer = self.fill(stream)
+        # The draw is still consumed, so streams stay in step whatever the rate
+        variate = buffer.pop()
+        return variate / rate if rate else float("inf")
+
+    def sample(self, stream: str, distribution) -> float:
+        """
+        Draw from a distribution, refilling its buffer a block at a time from the stream's uniforms
+        :param stream: Name of stream
+        :param distribution: Distribution to draw from
+        :return: Variate
+        """
+        entry = self.samples.get(stream)
+        if entry is None or entry[0] is not distribution or not entry[1]:
+            uniforms = self.uniforms(stream, Variates.BLOCK_SIZE * distribution.UNIFORMS)
+            entry = (distribution, distribution.sample(uniforms.reshape(Variates.BLOCK_SIZE, -1)).tolist())
+            self.samples[stream] = entry
+        return entry[1].pop()
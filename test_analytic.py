@@ -0,0 +1,103 @@
+import unittest
+from fractions import Fraction
+from math import factorial, lgamma
+
+import numpy
+
+from Analytic import Analytic
+from MarkovM1M2MCC import MarkovM1M2MCC
+from MarkovMMCC import MarkovMMCC
+
+
+def erlang_b(server_number: int, load: float) -> float:
+    """
+    Erlang-B blocking from its defining formula
+    :param server_number: Number of servers
+    :param load: Offered load
+    :return: Blocking probability
+    """
+    return load**server_number / factorial(server_number) / sum(load**k / factorial(k)
+                                                                 for k in range(server_number + 1))
+
+
+def threshold_losses(server_number: int, threshold: int, handover: float, combined: float) -> tuple:
+    """
+    Handover failure and new call blocking from the unnormalised occupancy terms, in exact arithmetic
+    :param server_number: Number of servers
+    :param threshold: Servers reserved for handovers
+    :param handover: Handover load
+    :param combined: Combined load
+    :return: Tuple of handover failure and new call blocking probability
+    """
+    common = server_number - threshold
+    handover, combined = Fraction(handover), Fraction(combined)
+    weights = [combined**k / factorial(k) if k <= common else
+               combined**common * handover**(k - common) / factorial(k) for k in range(server_number + 1)]
+    return float(weights[-1] / sum(weights)), float(sum(weights[common:]) / sum(weights))
+
+
+class TestAnalytic(unittest.TestCase):
+    """
+    Regression tests of the analytic formulas against known values, direct sums and the birth-death engines
+    """
+
+    def test_log_factorials(self):
+        table = Analytic.log_factorials(170)
+        for k in (0, 1, 2, 10, 170):
+            self.assertAlmostEqual(table[k], lgamma(k + 1), delta=1e-9 * max(1.0, table[k]))
+
+    def test_erlang_b_known_values(self):
+        self.assertAlmostEqual(float(Analytic.erlang_b(1, 1, 1)), 0.5)
+        self.assertAlmostEqual(float(Analytic.erlang_b(2, 1, 1)), 0.2)
+        self.assertAlmostEqual(float(Analytic.erlang_b(16, 0.1, 0.01)), 0.0223018720403636, places=12)
+
+    def test_erlang_b_direct(self):
+        loads = numpy.array([0.5, 5.0, 10.0, 30.0])
+        for server_number in (1, 8, 16, 40):
+            expected = [erlang_b(server_number, load) for load in loads]
+            numpy.testing.assert_allclose(Analytic.erlang_b(server_number, loads, 1.0), expected, rtol=1e-10)
+
+    def test_occupancy_direct(self):
+        distribution = Analytic.occupancy(16, 3, 0.03, 0.1, 0.01)
+        common = 13
+        weights = numpy.array([13.0**k / factorial(k) if k <= common else
+                               13.0**common * 3.0**(k - common) / factorial(k) for k in range(17)])
+        numpy.testing.assert_allclose(distribution, weights / weights.sum(), rtol=1e-10)
+
+    def test_threshold_losses_direct(self):
+        for threshold in (0, 1, 4, 16):
+            for handover, newcall in ((0.03, 0.1), (0.0, 0.1), (0.1, 0.0), (0.2, 0.2)):
+                HFP, CBP = Analytic.threshold_losses(16, threshold, handover, newcall, 0.01)
+                expected = threshold_losses(16, threshold, handover / 0.01, (handover + newcall) / 0.01)
+                numpy.testing.assert_allclose([HFP, CBP], expected, rtol=1e-10, atol=1e-300)
+
+    def test_threshold_losses_match_occupancy(self):
+        rates = numpy.linspace(0.01, 0.5, 7)
+        for threshold in (0, 2, 9):
+            distribution = Analytic.occupancy(24, threshold, rates, 0.1, 0.01)
+            HFP, CBP = Analytic.threshold_losses(24, threshold, rates, 0.1, 0.01)
+            numpy.testing.assert_allclose(HFP, distribution[:, -1], rtol=1e-10)
+            numpy.testing.assert_allclose(CBP, distribution[:, 24 - threshold:].sum(axis=-1), rtol=1e-10)
+
+    def test_threshold_losses_small_and_large(self):
+        # Tiny losses keep their relative accuracy and thousands of servers stay finite
+        HFP, CBP = Analytic.threshold_losses(200, 20, 0.01, 0.05, 0.01)
+        expected = threshold_losses(200, 20, 1.0, 6.0)
+        self.assertAlmostEqual(float(HFP) / expected[0], 1, places=9)
+        self.assertAlmostEqual(float(CBP) / expected[1], 1, places=9)
+        HFP, CBP = Analytic.threshold_losses(3000, 100, numpy.linspace(1, 40, 5), 10, 0.01)
+        self.assertTrue(numpy.all(numpy.isfinite(HFP)) and numpy.all((CBP >= HFP) & (CBP <= 1)))
+
+    def test_birth_death_engines(self):
+        machine = MarkovMMCC()
+        machine.run(16, 400000, arrival_rate=0.1, departure_rate=0.01, seed=1)
+        self.assertAlmostEqual(machine.blocking_probability(), float(Analytic.erlang_b(16, 0.1, 0.01)), delta=0.003)
+
+        machine = MarkovM1M2MCC()
+        machine.run(16, 400000, 2, handover_rate=0.03, newcall_rate=0.1, departure_rate=0.01, seed=1)
+        expected = float(Analytic.aggregated_blocking(16, 2, 0.03, 0.1, 0.01))
+        self.assertAlmostEqual(machine.blocking_probability(), expected, delta=0.1 * expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+
+import numpy
+
+from M1M2MCC import M1M2MCC
+from MMCC import MMCC
+
+
+def outcomes(machine: MMCC) -> dict:
+    """
+    :param machine: Simulation with a completed run
+    :return: Summary of the run without its wall time, which differs between runs
+    """
+    summary = machine.summary()
+    del summary["wall_time"]
+    return summary
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Tests that resuming a run from its last checkpoint finishes it exactly as the uninterrupted run did
+    """
+
+    def check_resume(self, model: type, **parameters):
+        """
+        Run to the end with checkpoints and a trace, then resume from the last checkpoint, which rewrites
+        the trace from that point
+        :param model: Simulation class
+        :param parameters: Keyword arguments of run
+        """
+        with TemporaryDirectory() as directory:
+            checkpoint, trace = join(directory, "run.checkpoint"), join(directory, "run.trace")
+            machine = model()
+            machine.run(checkpoint=checkpoint, checkpoint_interval=3000, trace=trace, **parameters)
+            with open(trace, "rb") as f:
+                expected = f.read()
+
+            resumed = MMCC.resume(checkpoint)
+            # Precision is NaN without batches, which the numpy comparison treats as equal
+            numpy.testing.assert_equal(outcomes(resumed), outcomes(machine))
+            with open(trace, "rb") as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_mmcc(self):
+        self.check_resume(MMCC, server_number=8, arrival_total=10000, arrival_rate=0.05, departure_rate=0.01,
+                          seed=1, warmup=500)
+
+    def test_m1m2mcc(self):
+        self.check_resume(M1M2MCC, total_servers=16, arrival_total=10000, threshold=2, handover_rate=0.03,
+                          newcall_rate=0.1, departure_rate=0.01, seed=2, precision=0.01, warmup="mser")
+
+
+if __name__ == "__main__":
+    unittest.main()
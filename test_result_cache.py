@@ -0,0 +1,59 @@
+import unittest
+from tempfile import TemporaryDirectory
+
+from ResultCache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Tests of the size account and eviction of the result cache
+    """
+
+    def total(cache: ResultCache) -> int:
+        """
+        :param cache: Result cache
+        :return: Size of the entries on disk
+        """
+        return sum(entry[1] for entry in cache.entries())
+
+    def test_bound_enforced(self):
+        with TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_bytes=20000)
+            for i in range(400):
+                cache.put(ResultCache.key(ResultCache, {"i": i}), {"values": list(range(20))})
+                self.assertLessEqual(TestResultCache.total(cache), 20000)
+                self.assertEqual(cache.size(), TestResultCache.total(cache))
+            self.assertGreater(TestResultCache.total(cache), 0)
+
+    def test_bound_after_unbounded_writes(self):
+        with TemporaryDirectory() as directory:
+            unbounded = ResultCache(directory)
+            for i in range(200):
+                unbounded.put(ResultCache.key(ResultCache, {"i": i}), {"values": list(range(100))})
+            self.assertEqual(unbounded.size(), TestResultCache.total(unbounded))
+
+            bounded = ResultCache(directory, max_bytes=50000)
+            bounded.put(ResultCache.key(ResultCache, {"i": 200}), {"values": list(range(100))})
+            self.assertLessEqual(TestResultCache.total(bounded), 50000)
+            self.assertEqual(bounded.size(), TestResultCache.total(bounded))
+
+    def test_overwrite_counted_once(self):
+        with TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_bytes=10**6)
+            key = ResultCache.key(ResultCache, {})
+            for i in range(50):
+                cache.put(key, {"values": list(range(200)), "i": i})
+            self.assertEqual(len(cache.entries()), 1)
+            self.assertEqual(cache.size(), TestResultCache.total(cache))
+
+    def test_clear(self):
+        with TemporaryDirectory() as directory:
+            cache = ResultCache(directory)
+            cache.put(ResultCache.key(ResultCache, {}), {"value": 1})
+            cache.clear()
+            self.assertEqual(cache.entries(), [])
+            self.assertEqual(cache.size(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
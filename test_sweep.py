@@ -0,0 +1,47 @@
+import unittest
+
+import numpy
+
+from M1M2MCC import M1M2MCC
+from MMCC import MMCC
+from Sweep import Sweep
+
+
+def outcomes(table: numpy.ndarray) -> dict:
+    """
+    :param table: Structured array returned by Sweep.run
+    :return: Columns of the table without wall times, which differ between runs
+    """
+    return {name: table[name] for name in table.dtype.names if not name.startswith("wall_time")}
+
+
+class TestSweep(unittest.TestCase):
+    """
+    Tests that seeded sweeps do not depend on how their runs are scheduled over processes
+    """
+
+    def check_workers(self, model: type, grid: dict, **parameters):
+        """
+        Run the same seeded sweep serially and on a pool of processes and compare the results
+        :param model: Simulation class
+        :param grid: Values of each swept parameter of run
+        :param parameters: Parameters of Sweep.run
+        """
+        serial = Sweep(model, workers=1).run(grid, **parameters)
+        parallel = Sweep(model, workers=2).run(grid, **parameters)
+        numpy.testing.assert_equal(outcomes(parallel), outcomes(serial))
+
+    def test_mmcc_seeded(self):
+        self.check_workers(MMCC, {"arrival_rate": [0.05, 0.1]}, seed=1, server_number=8, arrival_total=5000,
+                           departure_rate=0.01)
+
+    def test_mmcc_replications(self):
+        self.check_workers(MMCC, {"server_number": [4, 8]}, replications=3, seed=2, arrival_total=5000)
+
+    def test_m1m2mcc_common(self):
+        self.check_workers(M1M2MCC, {"threshold": [0, 2]}, replications=2, seed=3, common=True, antithetic=True,
+                           total_servers=16, arrival_total=5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from M1M2MCC import M1M2MCC
+from MMCC import MMCC
+from Trace import Trace
+
+
+class TestTrace(unittest.TestCase):
+    """
+    Tests that replaying a trace recovers the metrics of the run that wrote it
+    """
+
+    def check_replay(self, model: type, **parameters):
+        """
+        Run with a trace and compare the replayed metrics with those of the run
+        :param model: Simulation class
+        :param parameters: Keyword arguments of run
+        """
+        with TemporaryDirectory() as directory:
+            path = join(directory, "run.trace")
+            machine = model()
+            machine.run(trace=path, **parameters)
+            trace = Trace(path)
+            self.assertEqual(trace.warmup_arrivals, machine.warmup_arrivals)
+            self.assertAlmostEqual(trace.blocking_probability(), machine.blocking_probability(), places=12)
+            self.assertAlmostEqual(trace.server_utilisation(), machine.server_utilisation(), places=9)
+            # Release the memory map before the directory is removed
+            del trace
+
+    def test_mmcc(self):
+        self.check_replay(MMCC, server_number=8, arrival_total=10000, arrival_rate=0.05, departure_rate=0.01,
+                          seed=1)
+
+    def test_mmcc_warmup(self):
+        self.check_replay(MMCC, server_number=8, arrival_total=10000, arrival_rate=0.05, departure_rate=0.01,
+                          seed=1, warmup=2000)
+
+    def test_mmcc_stationary(self):
+        self.check_replay(MMCC, server_number=8, arrival_total=10000, arrival_rate=0.05, departure_rate=0.01,
+                          seed=3, start="stationary", warmup=1000)
+
+    def test_mmcc_mser(self):
+        self.check_replay(MMCC, server_number=8, arrival_total=20000, arrival_rate=0.05, departure_rate=0.01,
+                          seed=4, warmup="mser")
+
+    def test_m1m2mcc_warmup(self):
+        self.check_replay(M1M2MCC, total_servers=16, arrival_total=10000, threshold=2, handover_rate=0.03,
+                          newcall_rate=0.1, departure_rate=0.01, seed=2, warmup=1500)
+
+
+if __name__ == "__main__":
+    unittest.main()